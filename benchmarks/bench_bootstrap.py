@@ -0,0 +1,65 @@
+"""Bootstrap of one model on a replicated version of the insurance data set: one `sm.OLS` fit per
+resampled copy of the train set against `RunRegressions.bootstrap` (batched replicate weights).
+Run from the main folder: `python -m benchmarks.bench_bootstrap --copies 10 --resamples 1000 --n-jobs 4`
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import data_splitting as ds
+from src import linear_regression as lr
+
+
+FEATS = ['age', 'bmi', 'children', 'sex_d', 'smoker_d']
+
+
+def refits(train: pd.core.frame.DataFrame, resamples: int) -> np.ndarray:
+    import statsmodels.api as sm
+
+    rng = np.random.default_rng(0)
+    X = sm.add_constant(train[FEATS]).to_numpy(dtype=np.float64)
+    y = train['charges'].to_numpy(dtype=np.float64)
+    coefficients = []
+    for _ in range(resamples):
+        rows = rng.integers(0, len(y), len(y))
+        coefficients.append(sm.OLS(y[rows], X[rows]).fit().params)
+
+    return np.array(coefficients)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--copies', type=int, default=10)
+    parser.add_argument('--resamples', type=int, default=1000)
+    parser.add_argument('--n-jobs', type=int, default=4)
+    arguments = parser.parse_args()
+
+    df = pd.read_csv('data/insurance.csv')
+    df = pd.concat([df] * arguments.copies, ignore_index=True)
+    df['sex_d'] = (df['sex'] == 'male').astype(np.uint8)
+    df['smoker_d'] = (df['smoker'] == 'yes').astype(np.uint8)
+    train, validation, _ = ds.split_data(df, 42, 0.8)
+
+    run_reg = lr.RunRegressions()
+    run_reg.train, run_reg.validation = train, validation
+    run_reg.X, run_reg.y = [FEATS], ['charges']
+    resampler = ds.Bootstrap(arguments.resamples, 0)
+
+    cases = {
+        'sm.OLS refits': lambda: refits(train, arguments.resamples),
+        'batched': lambda: run_reg.bootstrap(resampler),
+        f'batched, {arguments.n_jobs} jobs': lambda: run_reg.bootstrap(resampler, n_jobs=arguments.n_jobs),
+    }
+
+    print(f'{len(train)} train rows, {arguments.resamples} replicates')
+    for name, function in cases.items():
+        start = time.perf_counter()
+        function()
+        print(f'{name:<18} {round(time.perf_counter() - start, 3):>8} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Memory and time of the pipeline stages with the default dtypes (float64/int64) against the
+`compact_dtypes` mode (float32 features, uint8 dummies, OLS estimated in float64).
+
+Each mode runs in its own process so the peak memory (RSS) is measured separately. The insurance
+data set is replicated to `--copies` times its size and given some rolling windows and
+polynomial terms; run from the main folder: `python -m benchmarks.bench_compact --copies 1000`
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from src import data_loader as dl
+from src import data_transformation as dt
+from src import data_splitting as ds
+from src import data_checks as dc
+from src import linear_regression as lr
+
+
+def run(path: str, compact: bool) -> None:
+    times = {}
+
+    def timed(stage: str, function, *args, **kwargs):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        times[stage] = time.perf_counter() - start
+        return result
+
+    df = timed('load', dl.read_data, path, downcast=compact)
+
+    def transform(df: pd.core.frame.DataFrame) -> pd.core.frame.DataFrame:
+        encoder = dt.Encoding_Engine(df)
+        encoder.binary('sex', False, True)
+        encoder.binary('smoker', False, True)
+        encoder.nonbinary('region', None, None, None, True)
+        encoder.log('charges', False)
+        df = encoder.apply()
+        df = dt.Rolling_Window.rolling_features(df, [{'variable': 'bmi', 'rows': [5, 20], 'transform': ['mean', 'standard_deviation']}])
+        df = dt.Polynomial_Features.polynomial_features(df, ['age', 'bmi', 'children', 'smoker_d'])
+        if compact:
+            df = dt.compact_dtypes(df)
+        return df
+
+    df = timed('transform', transform, df)
+    memory = df.memory_usage(deep=True).sum() / 2**20
+
+    train, validation, test = timed('split', ds.split_data, df, [5, 5], (0.6, 0.2))
+    timed('profile', dc.Data_Profile, train)
+
+    features = [col for col in train.columns if col not in ['charges', 'log_charges']]
+    regressions = lr.RunRegressions()
+    timed('OLS', regressions.reg_results, features, 'charges', train, validation)
+
+    stages = ' '.join(f'{stage} {round(seconds, 3)} s |' for stage, seconds in times.items())
+    print(f"{'compact' if compact else 'default':<8} {stages} frame {round(memory, 1)} MB | peak RSS {round(dl.peak_rss_mb(), 1)} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--copies', type=int, default=500)
+    parser.add_argument('--path', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--compact', action='store_true', help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+
+    if arguments.path:
+        run(arguments.path, arguments.compact)
+        return
+
+    source = pd.read_csv('data/insurance.csv')
+    df = pd.concat([source] * arguments.copies, ignore_index=True)
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'insurance.csv')
+        df.to_csv(path, index=False)
+        print(f'Rows: {df.shape[0]}\n')
+
+        for compact in [False, True]:
+            command = [sys.executable, '-m', 'benchmarks.bench_compact', '--path', path]
+            subprocess.run(command + (['--compact'] if compact else []), check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Encoding of binary and high-cardinality columns: the previous step-by-step conversions
+(`Series.apply`, `pd.get_dummies` with per-column renames, one concatenation per step) against
+`Encoding_Engine`. Run from the main folder: `python -m benchmarks.bench_encoding --rows 2000000`
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import data_transformation as dt
+
+
+def make_data(rows: int, categories: int) -> pd.core.frame.DataFrame:
+    rng = np.random.default_rng(0)
+
+    return pd.DataFrame({
+        'sex': rng.choice(['female', 'male'], rows),
+        'smoker': rng.choice(['yes', 'no'], rows),
+        'region': pd.Categorical(rng.integers(0, categories, rows).astype(str)),
+        'charges': rng.gamma(2.0, 5000.0, rows),
+        })
+
+
+def previous(df: pd.core.frame.DataFrame) -> pd.core.frame.DataFrame:
+    for variable in ['sex', 'smoker']:
+        first_value = df[variable].unique()[0]
+        df[f'{variable}_d'] = df[variable].apply(lambda x: 0 if x == first_value else 1)
+        df = df.drop(columns=variable)
+
+    dummies = pd.get_dummies(data=df['region'])
+    for col in dummies.columns:
+        dummies = dummies.rename(columns={col: f'{col}_region'})
+    df = pd.concat([df, dummies], axis=1).drop(columns=['region'])
+    df['log_charges'] = np.log(df['charges'])
+
+    return df
+
+
+def engine(df: pd.core.frame.DataFrame, sparse: bool) -> pd.core.frame.DataFrame:
+    encoder = dt.Encoding_Engine(df)
+    encoder.binary('sex', False, True)
+    encoder.binary('smoker', False, True)
+    encoder.nonbinary('region', None, 'region', None, True, sparse=sparse)
+    encoder.log('charges', False)
+
+    return encoder.apply()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--categories', type=int, default=200)
+    arguments = parser.parse_args()
+
+    df = make_data(arguments.rows, arguments.categories)
+    cases = {
+        'previous': lambda: previous(df.copy()),
+        'engine (dense)': lambda: engine(df, False),
+        'engine (sparse)': lambda: engine(df, True),
+    }
+
+    for name, function in cases.items():
+        start = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start
+        memory = result.memory_usage(deep=False).sum() / 2**20
+        print(f'{name:<16} {round(seconds, 3):>8} s {round(memory, 1):>10} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Leverage, studentized residuals, Cook's distance and DFFITS of one model: statsmodels `OLSInfluence`
+against `st.influence_measures`, which only uses the thin QR factor of the design matrix (statsmodels
+refits the model without each row for the externally studentized residuals, hence the small default).
+Run from the main folder: `python -m benchmarks.bench_influence --rows 10000 --features 10`
+"""
+
+import argparse
+import time
+
+import numpy as np
+import statsmodels.api as sm
+from statsmodels.stats.outliers_influence import OLSInfluence
+
+from src import statistical_tests as st
+
+
+def statsmodels_influence(ols) -> dict:
+    influence = OLSInfluence(ols)
+
+    return {
+        'leverage': influence.hat_matrix_diag,
+        'student_resid': influence.resid_studentized_external,
+        'cooks_d': influence.cooks_distance[0],
+        'dffits': influence.dffits[0],
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--features', type=int, default=10)
+    arguments = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = sm.add_constant(rng.normal(size=(arguments.rows, arguments.features)))
+    y = X.sum(axis=1) + rng.standard_t(3, size=arguments.rows)
+    ols = sm.OLS(y, X).fit()
+
+    results = {}
+    for name, function in {'statsmodels': lambda: statsmodels_influence(ols), 'thin QR': lambda: st.influence_measures(X, ols.resid)}.items():
+        start = time.perf_counter()
+        results[name] = function()
+        print(f'{name:<12} {round(time.perf_counter() - start, 3):>8} s')
+
+    difference = max(
+        (np.abs(results['statsmodels'][key] - results['thin QR'][key]) / np.abs(results['statsmodels'][key]).max()).max()
+        for key in results['statsmodels']
+        )
+    print(f'Largest relative difference: {difference:.2e}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Normality tests of the residuals of many models: the previous per-model scipy calls (each test run
+twice, once for the statistic and once for the p-value) against `st.normality_table`, which runs the
+tests of all the models on one residual matrix.
+Run from the main folder: `python -m benchmarks.bench_normality --rows 200000 --models 20`
+"""
+
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from src import statistical_tests as st
+
+
+def per_model(residuals: pd.core.frame.DataFrame) -> list:
+    container = []
+    for col in residuals.columns:
+        x = residuals[col]
+        container.append([
+            (test(x)[0], test(x)[1])
+            for test in [stats.shapiro, stats.normaltest, lambda x: stats.kstest(x, 'norm'), stats.jarque_bera]
+            ])
+
+    return container
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--models', type=int, default=20)
+    arguments = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    residuals = pd.DataFrame(rng.standard_t(10, size=(arguments.rows, arguments.models)))
+
+    warnings.simplefilter('ignore')
+    for name, function in {'per model': lambda: per_model(residuals), 'batched': lambda: st.normality_table(residuals)}.items():
+        start = time.perf_counter()
+        function()
+        print(f'{name:<12} {round(time.perf_counter() - start, 3):>8} s')
+
+
+if __name__ == '__main__':
+    main()
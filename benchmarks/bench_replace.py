@@ -0,0 +1,72 @@
+"""Value replacement on a single large column: the previous per-element `Series.apply` path
+against `Replace_Values.replace_values_batch` (vectorized `isin` masks, in-place writes, fill
+statistics computed once per column). Run from the main folder: `python -m benchmarks.bench_replace`
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import data_transformation as dt
+
+
+REPLACEMENTS = [
+    {'variable': 'x', 'replace': [1, 12, 14, 27, 31, 45], 'value': -1},
+    {'variable': 'x', 'replace': 3, 'value': -3},
+    {'variable': 'y', 'replace': 'missing_values', 'transform': 'median'},
+    {'variable': 'z', 'replace': 'missing_values', 'transform': 'quantile=0.75'},
+]
+
+
+def make_data(rows: int) -> pd.core.frame.DataFrame:
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=rows)
+    y[rng.random(rows) < 0.05] = np.nan
+
+    return pd.DataFrame({'x': rng.integers(0, 50, rows), 'y': y, 'z': y.copy()})
+
+
+def previous(df: pd.core.frame.DataFrame) -> pd.core.frame.DataFrame:
+    for dic in REPLACEMENTS:
+        variable, replace = dic['variable'], dic['replace']
+        if replace == 'missing_values':
+            series = df[variable]
+            if dic['transform'] == 'median':
+                value = series.median()
+            else:
+                value = series.quantile(float(dic['transform'][9:]))
+            df[variable] = series.fillna(value)
+        elif isinstance(replace, list):
+            set(df[variable].unique())
+            df[variable] = df[variable].apply(lambda x: dic['value'] if x in replace else x)
+        else:
+            set(df[variable].unique())
+            df[variable] = df[variable].apply(lambda x: dic['value'] if x == replace else x)
+
+    return df
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    arguments = parser.parse_args()
+
+    df = make_data(arguments.rows)
+    cases = {
+        'previous': lambda: previous(df.copy()),
+        'batch': lambda: dt.Replace_Values.replace_values_batch(df.copy(), REPLACEMENTS)[0],
+    }
+
+    results = {}
+    for name, function in cases.items():
+        start = time.perf_counter()
+        results[name] = function()
+        print(f'{name:<10} {round(time.perf_counter() - start, 3):>8} s')
+
+    print(f"identical results: {results['previous'].equals(results['batch'])}")
+
+
+if __name__ == '__main__':
+    main()
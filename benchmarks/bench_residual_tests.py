@@ -0,0 +1,61 @@
+"""Breusch-Pagan, White, Durbin-Watson and Ljung-Box tests of many fitted models: the statsmodels
+functions (one auxiliary OLS fit per test and model) against `st.residual_tests_table`, which reuses
+the pseudo-inverse of the Gram matrix kept by each result.
+Run from the main folder: `python -m benchmarks.bench_residual_tests --rows 100000 --models 50`
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from statsmodels.stats.diagnostic import het_breuschpagan, het_white, acorr_ljungbox
+from statsmodels.stats.stattools import durbin_watson
+
+from src import linear_regression as lr
+from src import statistical_tests as st
+
+
+def per_model(results_store: list) -> list:
+    container = []
+    for result in results_store:
+        ols = result['ols']
+        container.append([
+            het_breuschpagan(ols.resid, ols.model.exog)[0],
+            het_white(ols.resid, ols.model.exog)[0],
+            durbin_watson(ols.resid),
+            acorr_ljungbox(ols.resid).iloc[-1, 0],
+            ])
+
+    return container
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--features', type=int, default=8)
+    parser.add_argument('--models', type=int, default=50)
+    arguments = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(arguments.rows, arguments.features))
+    df = pd.DataFrame(X, columns=[f'x{i}' for i in range(arguments.features)])
+    df['y'] = X.sum(axis=1) + rng.normal(size=arguments.rows) * (1 + np.abs(X[:, 0]))
+    results_store = []
+    for _ in range(arguments.models):
+        feats = np.sort(rng.choice(arguments.features, rng.integers(2, arguments.features + 1), replace=False))
+        results_store.append(lr.Regression_Result([f'x{i}' for i in feats], 'y', df, df))
+
+    results = {}
+    for name, function in {'statsmodels': lambda: per_model(results_store), 'shared': lambda: st.residual_tests_table(results_store)}.items():
+        start = time.perf_counter()
+        results[name] = function()
+        print(f'{name:<12} {round(time.perf_counter() - start, 3):>8} s')
+
+    slow = np.array(results['statsmodels'])
+    fast = results['shared']['Statistic'].to_numpy().reshape(-1, 4)
+    print(f'Largest relative difference: {(np.abs(slow - fast) / np.abs(slow)).max():.2e}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Time and retained memory of the results of many candidate models: the previous eager result
+dictionaries (two statsmodels fits, the summary, residual and prediction series) against the lazy
+`Regression_Result` objects, of which only the validation errors are read (as in the error comparison).
+Run from the main folder: `python -m benchmarks.bench_results --rows 100000 --models 200`
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src import linear_regression as lr
+
+
+def eager_result(feats: list, target: str, train: pd.core.frame.DataFrame, validation: pd.core.frame.DataFrame) -> dict:
+    import statsmodels.api as sm
+
+    X_train = sm.add_constant(train[feats], prepend=True).to_numpy(dtype=np.float64)
+    est = sm.OLS(train[target].to_numpy(dtype=np.float64), X_train)
+    ols = est.fit()
+    X_validation = sm.add_constant(validation[feats], prepend=True).to_numpy(dtype=np.float64)
+    prediction_train = ols.predict(X_train)
+    prediction_validation = ols.predict(X_validation)
+    mse = round(np.mean((validation[target].to_numpy() - prediction_validation)**2), 2)
+
+    return {
+        'feats': feats,
+        'target': target,
+        'ols': est.fit(),
+        'summary': ols.summary2(),
+        'mse': mse,
+        'rmse': round(np.sqrt(mse), 2),
+        'residuals_train': train[target] - prediction_train,
+        'residuals_validation': validation[target] - prediction_validation,
+        'prediction_train': prediction_train,
+        'prediction_validation': prediction_validation,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--features', type=int, default=8)
+    parser.add_argument('--models', type=int, default=200)
+    arguments = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2 * arguments.rows, arguments.features))
+    df = pd.DataFrame(X, columns=[f'x{i}' for i in range(arguments.features)])
+    df['y'] = X.sum(axis=1) + rng.normal(size=2 * arguments.rows)
+    train, validation = df.iloc[:arguments.rows], df.iloc[arguments.rows:]
+    models = [
+        [f'x{i}' for i in np.sort(rng.choice(arguments.features, rng.integers(1, arguments.features + 1), replace=False))]
+        for _ in range(arguments.models)
+        ]
+
+    errors = {}
+    for name, function in {'eager': eager_result, 'lazy': lr.Regression_Result}.items():
+        tracemalloc.start()
+        start = time.perf_counter()
+        store = [function(feats, 'y', train, validation) for feats in models]
+        errors[name] = [result['mse'] for result in store]
+        elapsed = time.perf_counter() - start
+        retained = tracemalloc.get_traced_memory()[0] / 2**20
+        tracemalloc.stop()
+        del store
+        print(f'{name:<6} {round(elapsed, 3):>8} s {round(retained, 1):>10} MB retained')
+
+    print(f"Same validation MSE: {errors['eager'] == errors['lazy']}")
+
+
+if __name__ == '__main__':
+    main()
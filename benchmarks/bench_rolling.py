@@ -0,0 +1,71 @@
+"""Several windows and statistics for one column: one `Rolling_Window.rolling_window` call per
+combination against a single `Rolling_Window.rolling_features` call. Also checks the precision of
+short-window standard deviations of a long trending series against an exact two-pass computation.
+Run from the main folder: `python -m benchmarks.bench_rolling --rows 5000000`
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src import data_transformation as dt
+
+
+WINDOWS = {
+    'variable': 'x',
+    'rows': [5, 20, 60],
+    'transform': ['mean', 'standard_deviation', 'minimum', 'maximum'],
+    'one_ahead': [False, True],
+    }
+
+
+def one_at_a_time(df: pd.core.frame.DataFrame) -> pd.core.frame.DataFrame:
+    for rows in WINDOWS['rows']:
+        for transform in WINDOWS['transform']:
+            for one_ahead in WINDOWS['one_ahead']:
+                rolled = getattr(df['x'].rolling(rows), {'standard_deviation': 'std', 'minimum': 'min', 'maximum': 'max'}.get(transform, transform))()
+                if one_ahead:
+                    rolled = rolled.shift(1)
+                df.insert(loc=1, column=f'x_{rows}_{transform}_{one_ahead}', value=rolled.fillna(0))
+
+    return df
+
+
+def check_precision(rows: int) -> None:
+    """Standard deviations of short windows of a trend (0 to 1e4) plus N(0, 1) noise."""
+
+    x = np.linspace(0, 1e4, rows) + np.random.default_rng(1).normal(size=rows)
+    statistics = dt.Rolling_Statistics(x)
+    for window in [2, 5, 60]:
+        exact = sliding_window_view(x, window).std(axis=1, ddof=1)
+        computed = statistics.compute(window, 'standard_deviation', 1, np.empty(rows))[window - 1:]
+        pandas = pd.Series(x).rolling(window).std().to_numpy()[window - 1:]
+        error = (np.abs(computed - exact) / exact).max()
+        print(f'window {window:>3}: largest relative error {error:.1e} (pandas rolling: {(np.abs(pandas - exact) / exact).max():.1e})')
+        assert error < 1e-6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    arguments = parser.parse_args()
+
+    df = pd.DataFrame({'x': np.random.default_rng(0).normal(size=arguments.rows)})
+    cases = {
+        'one at a time': lambda: one_at_a_time(df.copy()),
+        'generator': lambda: dt.Rolling_Window.rolling_features(df, [WINDOWS]),
+    }
+
+    for name, function in cases.items():
+        start = time.perf_counter()
+        function()
+        print(f'{name:<14} {round(time.perf_counter() - start, 3):>8} s')
+
+    check_precision(min(arguments.rows, 1_000_000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Compares reading the insurance data set from CSV with the SQLite backend of `data_loader`.
+
+The data set is replicated to `--copies` times its size; run from the main folder:
+`python -m benchmarks.bench_sqlite --copies 500`
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+
+from src import data_loader as dl
+
+
+def timed(function, *args, **kwargs) -> tuple:
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return (result, time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--copies', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=100_000)
+    arguments = parser.parse_args()
+
+    source = pd.read_csv('data/insurance.csv')
+    df = pd.concat([source] * arguments.copies, ignore_index=True)
+
+    columns = ['age', 'bmi', 'smoker', 'charges']
+    query = 'bmi > 30 & smoker == "yes"'
+
+    with tempfile.TemporaryDirectory() as folder:
+        csv_path = os.path.join(folder, 'insurance.csv')
+        db_path = os.path.join(folder, 'insurance.db')
+
+        df.to_csv(csv_path, index=False)
+        with sqlite3.connect(db_path) as connection:
+            df.to_sql('insurance', connection, index=False)
+
+        print(f'Rows: {df.shape[0]}\n')
+
+        cases = {
+            'CSV, all rows, then query': lambda: pd.read_csv(csv_path).query(query),
+            'CSV, chunked + downcast, then query': lambda: dl.read_data(csv_path, chunk_size=arguments.batch_size, downcast=True).query(query),
+            'SQLite, all rows, then query': lambda: dl.read_sqlite(db_path, 'insurance', batch_size=arguments.batch_size).query(query),
+            'SQLite, columns + query pushed down': lambda: dl.read_sqlite(db_path, 'insurance', columns=columns, query=query, batch_size=arguments.batch_size),
+            'SQLite, pushed down + downcast': lambda: dl.read_sqlite(db_path, 'insurance', columns=columns, query=query, batch_size=arguments.batch_size, downcast=True),
+        }
+
+        for name, case in cases.items():
+            result, seconds = timed(case)
+            memory = round(result.memory_usage(deep=True).sum() / 2**20, 2)
+            print(f'{name:<40} {round(seconds, 3):>8} s {result.shape[0]:>10} rows {memory:>10} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Start-up time of `main.py` with lazy imports against forcing every stage's dependencies.
+
+'headless' only imports what a run without plots, feature selection or regressions needs;
+'all stages' additionally touches the lazily imported modules, which is what the eager imports
+used to cost on every run. Run from the main folder: `python -m benchmarks.bench_startup`
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+
+CASES = {
+    'headless': 'import main',
+    'all stages': 'import main; main.dv.Histogram; main.lr.RunRegressions; main.st.normality_tests; main.fs.Feat_Selector',
+}
+
+
+def best_of(code: str, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True)
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    arguments = parser.parse_args()
+
+    baseline = best_of('pass', arguments.repeat)
+    print(f"{'interpreter only':<20} {round(baseline, 3):>7} s")
+
+    for name, code in CASES.items():
+        print(f'{name:<20} {round(best_of(code, arguments.repeat), 3):>7} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""VIFs of several groups of variables drawn from a data set with 200+ correlated features: one
+statsmodels `variance_inflation_factor` regression per variable and group against `sa.VIF`, which
+inverts submatrices of one correlation matrix.
+Checks that the correlation matrix is computed once for all the groups.
+Run from the main folder: `python -m benchmarks.bench_vif --rows 5000 --features 210`
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import statistical_analysis as sa
+
+
+def auxiliary_regressions(df: pd.core.frame.DataFrame, groups: list) -> list:
+    from statsmodels.stats.outliers_influence import variance_inflation_factor
+    from statsmodels.tools.tools import add_constant
+
+    container = []
+    for feats in groups:
+        X = add_constant(df[feats]).to_numpy(dtype=np.float64)
+        container.append(pd.Series([variance_inflation_factor(X, i) for i in range(1, X.shape[1])], index=feats))
+
+    return container
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5_000)
+    parser.add_argument('--features', type=int, default=210)
+    arguments = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    factors = rng.normal(size=(arguments.rows, 20))
+    values = factors @ rng.normal(size=(20, arguments.features)) + rng.normal(size=(arguments.rows, arguments.features))
+    df = pd.DataFrame(values, columns=[f'x{i}' for i in range(arguments.features)])
+
+    columns = list(df.columns)
+    groups = [columns, columns[:arguments.features // 2], columns[arguments.features // 2:], columns[::3]]
+
+    calls = []
+    correlation_matrix = sa.correlation_matrix
+
+    def counted_correlation_matrix(*args, **kwargs):
+        calls.append(1)
+        return correlation_matrix(*args, **kwargs)
+
+    def closed_form() -> list:
+        vif = sa.VIF()
+        vif.df, vif.X = df, groups
+        sa.correlation_matrix = counted_correlation_matrix
+        try:
+            vif.store_vif()
+        finally:
+            sa.correlation_matrix = correlation_matrix
+        return vif.vif_container
+
+    results = {}
+    for name, function in {'auxiliary regressions': lambda: auxiliary_regressions(df, groups), 'closed form': closed_form}.items():
+        start = time.perf_counter()
+        results[name] = function()
+        print(f'{name:<22} {round(time.perf_counter() - start, 3):>8} s')
+
+    difference = max(
+        (np.abs(slow - fast.reindex(slow.index)) / slow).max()
+        for slow, fast in zip(results['auxiliary regressions'], results['closed form'])
+        )
+    print(f'Largest relative difference: {difference:.2e}')
+
+    # All the groups share one correlation matrix.
+    assert len(calls) == 1, f'correlation_matrix was computed {len(calls)} times for {len(groups)} groups'
+    print(f'Correlation matrices computed for {len(groups)} groups: {len(calls)}')
+
+
+if __name__ == '__main__':
+    main()
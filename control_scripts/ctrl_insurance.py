@@ -28,6 +28,13 @@ error_comparison = True
 initial_features = ['age', 'sex', 'bmi', 'children', 'smoker', 'region', 'charges']
 target_container = ['charges', 'log_charges']
 
+# Load data in chunks with compact dtypes ('columns': 'referenced' reads only the columns used in this script).
+# load_data = {'chunk_size': 100_000, 'columns': 'referenced', 'downcast': True}
+# cache_data = {'max_size_mb': 500, 'max_age_days': 30}
+# sqlite_data = {'table': 'insurance', 'query': 'bmi > 30', 'batch_size': 50_000}
+# Keep features in float32 and dummies in uint8 for the whole run.
+# compact_dtypes = True
+
 # View data.
 data_view_1 = {'rows': [0, 5], 'columns': initial_features,}
 data_view_2 =  {}
@@ -46,7 +53,7 @@ convert_binary_to_dummy = [
     {'variable': 'smoker', 'invert': False, 'drop_current': True},
     ]
 
-# All keys: ('variable', 'add_suffix', 'drop_dummy', 'dummies_names', 'drop_current')
+# All keys: ('variable', 'add_suffix', 'drop_dummy', 'dummies_names', 'drop_current', 'sparse')
 # convert_nonbinary_to_dummies = [
 #     {'variable': 'region', 'drop_dummy': 1, 'drop_current': True},
 #     ]
@@ -61,6 +68,8 @@ convert_to_categorical = [
     {'variable': 'region', 'drop_current': True},
 ]
 
+# polynomial_features = {'variables': ['age', 'bmi', 'children', 'smoker_d'], 'degree': 2, 'target': 'charges', 'top_k': 5, 'sparse': True}
+
 #### Split data.
 
 split_data = {
@@ -68,8 +77,11 @@ split_data = {
     'proportions': (0.6, 0.2,), 
     'shuffle': False,
     }
+# Reproducible split from a hash of the row number (or of a `key` column):
+# split_data = {'method': 'hash', 'rand_state': 5, 'proportions': (0.6, 0.2,)}
 
 # standardize_data = {'transform': 'z_score',  'include_binary': ['smoker_d'], 'round': 2} #'include_binary': True,   
+# standardize_data = {'transform': 'z_score', 'fit_on': 'train', 'dtype': 'float32', 'save_to': 'scaler.json'}
 
 
 #### Data trimming
@@ -198,3 +210,21 @@ manual_model_container = [
     {'target': 'charges', 'x_vars': ['age', 'sex_d', 'smoker_d',],},
     {'target': 'charges', 'x_vars': ['age', 'sex_d', 'bmi', 'children', 'smoker_d',],},
     ]
+
+# Memory-bounded regression results: residuals/predictions above 'spill_mb' MB are kept on disk.
+# result_storage = {'spill_mb': 50, 'spill_dir': None}
+
+# Options of the heteroskedasticity and autocorrelation tests of the residuals analysis.
+# residual_tests = {'white_max_terms': 45, 'lags': 10}
+
+# Leverage, studentized residuals, Cook's distance and DFFITS of the train rows ('top_k' most influential).
+# influence = {'top_k': 10, 'sort_by': 'cooks_d'}
+
+# K-fold cross validation of the models above (method: 'kfold', 'stratified' or 'group').
+# cross_validation = {'method': 'stratified', 'n_splits': 5, 'n_repeats': 3, 'target': 'charges', 'rand_state': 42, 'n_jobs': 2}
+
+# Walk-forward (rolling origin) evaluation for data ordered in time.
+# walk_forward = {'window': 'sliding', 'initial_rows': 600, 'test_rows': 100}
+
+# Bootstrap confidence intervals of the coefficients and of the validation RMSE.
+# bootstrap = {'n_resamples': 2000, 'rand_state': 42, 'confidence': 0.95}
@@ -1,17 +1,20 @@
-import subprocess, re, importlib, glob
+import subprocess, re, importlib, glob, time
 
 from src import utils as ut
 from src import data_loader as dl
 from src import data_viewer as viewer
 from src import data_transformation as dt
 from src import data_splitting as ds
-from src import data_visualization as dv
-from src import linear_regression as lr
-from src import statistical_tests as st
-from src import feature_selection as fs
 from src import data_checks as dc
 from src import statistical_analysis as sa
 
+# Modules that depend on the plotting, statsmodels and scikit-learn stacks are only imported
+# when the stage that uses them runs.
+dv = ut.lazy_import('src.data_visualization')
+lr = ut.lazy_import('src.linear_regression')
+st = ut.lazy_import('src.statistical_tests')
+fs = ut.lazy_import('src.feature_selection')
+
 import pandas as pd
 import numpy as np
 
@@ -35,12 +38,66 @@ class DataPath:
     SOURCE_DATA_PATH = f"../{c.main_folder_name}/data/{c.data_file_name}"
     PDF_PATH = f"../{c.main_folder_name}/exported_pdf"
     NOTEBOOK_PATH = f"../{c.main_folder_name}/output.ipynb"
+    CACHE_PATH = f"../{c.main_folder_name}/cache"
 
 def main() -> None:
     if c.identify_origin_script:
         print(f'Control script: {extract_name}.py\n\n')
 
-    main = dl.read_data(DataPath.SOURCE_DATA_PATH)
+    load_start = time.perf_counter()
+    load_source = None
+
+    sqlite_parameters = None
+    if hasattr(c, 'sqlite_data'):
+        sqlite_parameters = ut.unfold_dictionary(c.sqlite_data, dl.Sqlite_Data.keys)
+
+    load_parameters = {}
+    if hasattr(c, 'load_data'):
+        load_parameters = ut.unfold_dictionary(c.load_data, dl.Load_Data.keys)
+
+        # Only read the columns mentioned in the control script.
+        if load_parameters['columns'] == 'referenced':
+            load_parameters['columns'] = dl.referenced_columns(
+                DataPath.SOURCE_DATA_PATH,
+                c,
+                c.lower_case_columns,
+                sqlite_parameters['table'] if sqlite_parameters else None,
+                )
+
+    # Compact execution: floats as float32 and dummies as uint8 from loading to the regressions,
+    # which are estimated in float64.
+    compact = bool(getattr(c, 'compact_dtypes', False))
+    if compact:
+        load_parameters['downcast'] = True
+
+    if sqlite_parameters:
+        # An integer selects the query in `query_container` to push down to the database.
+        query = sqlite_parameters['query']
+        if isinstance(query, int):
+            query = c.query_container[query]['query']
+
+        main = dl.read_sqlite(
+            DataPath.SOURCE_DATA_PATH,
+            table=sqlite_parameters['table'],
+            columns=load_parameters.get('columns'),
+            query=query,
+            batch_size=sqlite_parameters['batch_size'] or load_parameters.get('chunk_size'),
+            downcast=bool(load_parameters.get('downcast')),
+            category_threshold=load_parameters.get('category_threshold'),
+            )
+        load_source = f"SQLite table '{sqlite_parameters['table']}'"
+
+    elif hasattr(c, 'cache_data'):
+        cache_parameters = ut.unfold_dictionary(c.cache_data, dl.Cache_Data.keys)
+        if cache_parameters['cache_dir'] is None:
+            cache_parameters['cache_dir'] = DataPath.CACHE_PATH
+
+        main, cache_hit = dl.cached_read_data(DataPath.SOURCE_DATA_PATH, **cache_parameters, **load_parameters)
+        load_source = 'cache (warm)' if cache_hit else 'CSV (cold, now cached)'
+    else:
+        main = dl.read_data(DataPath.SOURCE_DATA_PATH, **load_parameters)
+
+    load_time = time.perf_counter() - load_start
 
     if c.lower_case_columns:
         main = dl.lower_case_cols(main)
@@ -48,8 +105,12 @@ def main() -> None:
     # Converting the data frame int a 2D array to compare with the version after transformations.
     main_initial = main.values 
 
+    # Column statistics (dtypes, NAs, summary statistics, unique values) shared by the stages below.
+    profiles = dc.Profile_Store()
+
     print('#### Initial Variables:\n') 
-    summary_stats_1 = main.info()
+    summary_stats_1 = profiles.get('main', main).info()
+    print(f'\n{dl.load_report(load_time, main, load_source)}')
     print('\n')
 
     if c.print_columns:
@@ -71,49 +132,47 @@ def main() -> None:
 
     if c.data_description_1:
         print('Variable Description Before Data Processing:\n')
-        print(main.describe(), '\n\n')
+        print(profiles.get('main', main).describe(), '\n\n')
 
     #### Data processing.
 
     if c.check_na:
         print('Missing Values (NAs) Per Column:')
-        na_values = main.isna().sum()
+        na_values = profiles.get('main', main).na_counts()
         print(f'\n{na_values}\n\n')
 
     if hasattr(c, 'replace_values'):
-        messages = []
-        for dic in c.replace_values:
-            full_dic = ut.unfold_dictionary(dic, dt.Replace_Values.keys)
-            main, message = dt.Replace_Values.replace_values(
-                variable=full_dic['variable'],
-                df=main,
-                replace=full_dic['replace'],
-                value=full_dic['value'],
-                transform=full_dic['transform'],
-                ddof=full_dic['ddof'],
-                )
-            if message:
-                messages.append(message)
+        main, messages = dt.Replace_Values.replace_values_batch(
+            main,
+            c.replace_values,
+            lambda: profiles.get('main', main).summary,
+            )
+        messages = [message for message in messages if message]
         if messages:
             print('Value replacement report:')
             print(*messages, sep='\n')
             print('\n') 
 
+        # Values are replaced in place.
+        profiles.invalidate('main')
+
 
     if c.remove_na:
         main = main.dropna().reset_index(drop=True)
 
     if c.check_na or c.remove_na:
         print('Missing values (NAs) After Replacement/Removal:')
-        na_values = main.isna().sum()
+        na_values = profiles.get('main', main).na_counts()
         print(f'\n{na_values}\n\n')
 
 
+    # The conversions are collected and the data frame is assembled once.
+    encoder = dt.Encoding_Engine(main)
+
     if hasattr(c, 'convert_binary_to_dummy'):
         for dic in c.convert_binary_to_dummy:
-            main = dt.binary_to_dummy(
+            encoder.binary(
                 dic['variable'],
-                main,
                 dic['invert'],
                 dic['drop_current']
                 )
@@ -121,58 +180,77 @@ def main() -> None:
     if hasattr(c, 'convert_nonbinary_to_dummies'):
         for dic in c.convert_nonbinary_to_dummies:
             full_dic = ut.unfold_dictionary(dic, dt.Nonbinary_To_Dummies.keys)
-            main = dt.Nonbinary_To_Dummies.nonbinary_to_dummies(
+            encoder.nonbinary(
                 full_dic['variable'],
-                main,
                 full_dic['drop_dummy'],
                 full_dic['add_suffix'],
                 full_dic['dummies_names'],
                 full_dic['drop_current'],
+                sparse=bool(full_dic['sparse']),
                 )
 
     if hasattr(c, 'convert_to_log'):
         for dic in c.convert_to_log:
-            main = dt.log_variable(
+            encoder.log(
                 dic['variable'],
-                main,
                 dic['drop_current']
                 )
 
     if hasattr(c, 'convert_to_categorical'):
         for dic in c.convert_to_categorical:
-            main = dt.categorize_variable(
+            encoder.categorical(
                 dic['variable'],
-                main,
                 dic['drop_current']
                 )
+
+    main = encoder.apply()
             
     if hasattr(c, 'rolling_window'):
-        for dic in c.rolling_window:
-            full_dic = ut.unfold_dictionary(
-                dic, dt.Rolling_Window.keys
-                )
-            main = dt.Rolling_Window.rolling_window(
-                var=full_dic['variable'],
-                df=main,
-                rows=full_dic['rows'],
-                transform=full_dic['transform'],
-                one_ahead=full_dic['one_ahead'],
-                replace_na=full_dic['replace_na'],
-                ddof=full_dic['ddof'],
-                drop_current=full_dic['drop_current'],
-                )
+        main = dt.Rolling_Window.rolling_features(main, c.rolling_window)
+
+    if hasattr(c, 'percentage_change'):
+        main = dt.Percentage_Change.percentage_changes(main, c.percentage_change)
+
+    if hasattr(c, 'polynomial_features'):
+        full_dic = ut.unfold_dictionary(c.polynomial_features, dt.Polynomial_Features.keys)
+        main = dt.Polynomial_Features.polynomial_features(
+            df=main,
+            variables=full_dic['variables'],
+            degree=full_dic['degree'],
+            interaction_only=full_dic['interaction_only'],
+            target=full_dic['target'],
+            min_correlation=full_dic['min_correlation'],
+            top_k=full_dic['top_k'],
+            memory_mb=full_dic['memory_mb'],
+            sparse=full_dic['sparse'],
+            dtype=full_dic['dtype'] or ('float32' if compact else 'float64'),
+            )
+
+    if compact:
+        main = dt.compact_dtypes(main)
 
     # CHANGES SPLIT RELATED START BELOW
     
     if hasattr(c, 'split_data'):
         split = True
-
-        train, validation, test = ds.split_data(
-            main,
-            c.split_data['rand_state'],
-            c.split_data['proportions'],
-            shuffle=c.split_data['shuffle'],
-            )  
+        split_parameters = ut.unfold_dictionary(c.split_data, ds.Split_Data.keys)
+
+        if split_parameters['method'] == 'hash':
+            # Reproducible membership computed row by row from a hash of `key` (or of the row number).
+            train, validation, test = ds.Hash_Split(
+                split_parameters['proportions'],
+                split_parameters['key'],
+                split_parameters['rand_state'],
+                ).split(main)
+        elif split_parameters['method'] in [None, 'shuffle']:
+            train, validation, test = ds.split_data(
+                main,
+                split_parameters['rand_state'],
+                split_parameters['proportions'],
+                shuffle=True if split_parameters['shuffle'] is None else split_parameters['shuffle'],
+                )
+        else:
+            raise Exception("The `method` in `split_data` can only be 'shuffle' (default) or 'hash'.")
     
         data_sets = {
             'main': main,
@@ -202,20 +280,57 @@ def main() -> None:
 
     if hasattr(c, 'standardize_data'):
         standardize_parameters = ut.unfold_dictionary(c.standardize_data, dt.Standardize.keys)
+        dtype = standardize_parameters['dtype'] or ('float32' if compact else 'float64')
+
+        scaler = None
+        if standardize_parameters['load_from']:
+            scaler = dt.Scaler.load(standardize_parameters['load_from'])
+        elif standardize_parameters['fit_on']:
+            fit_on = standardize_parameters['fit_on']
+            if fit_on not in data_sets:
+                raise Exception(f"`fit_on` must be one of the available data sets: {', '.join(data_sets)}.")
+            scaler = dt.Scaler(
+                standardize_parameters['transform'],
+                dt.Standardize.columns_to_scale(
+                    data_sets[fit_on],
+                    standardize_parameters['vars'],
+                    standardize_parameters['include_binary'],
+                    ),
+                )
+            scaler.fit(data_sets[fit_on])
+
         for key in data_sets:
-            data_sets[key] = dt.Standardize.standardize(
-                df=data_sets[key],
-                vars=standardize_parameters['vars'],
-                transform=standardize_parameters['transform'],
-                include_binary=standardize_parameters['include_binary'],
-                round=standardize_parameters['round'],
-            )
+            if (standardize_parameters['load_from'] is None) and (standardize_parameters['fit_on'] is None):
+                # Each data set is scaled with its own statistics.
+                scaler = dt.Scaler(
+                    standardize_parameters['transform'],
+                    dt.Standardize.columns_to_scale(
+                        data_sets[key],
+                        standardize_parameters['vars'],
+                        standardize_parameters['include_binary'],
+                        ),
+                    )
+                scaler.fit(data_sets[key])
+
+            # Every data set is replaced by a shallow copy in which only the scaled columns are new
+            # arrays; the unscaled columns are shared with the unscaled frame.
+            data_sets[key] = scaler.transform(
+                data_sets[key].copy(deep=False), dtype, standardize_parameters['round'],
+                )
+
+        if standardize_parameters['save_to']:
+            scaler.save(standardize_parameters['save_to'])
 
 
     #### TRIMMING
     if hasattr(c, 'trim_container'):
         
-        trimmer = dt.Trim_Data()
+        # Statistics are shared by the trims; each trimmed version is kept as a view of the rows
+        # (see `dt.Row_View`) until it is used.
+        trimmer = dt.Trim_Engine(
+            data_sets,
+            lambda name: profiles.get(name, data_sets[name]).summary,
+            )
 
         # We store for each element in `c.trim_container` the data set(s) trimmed versions.
         trimmed_storage = {i: {} for i in range(len(c.trim_container))}
@@ -236,8 +351,8 @@ def main() -> None:
                 raise Exception("Could not find a valid expression for 'df'.")
             
             for df in to_trim:
-                trimmed = trimmer.trim_data(
-                    df=data_sets[df],
+                trimmed = trimmer.trim(
+                    name=df,
                     variable=full_dic['variable'],
                     boundaries=full_dic['boundaries'],
                     value=full_dic['value'],
@@ -263,10 +378,11 @@ def main() -> None:
         all_data_sets['trim'] = trimmed_storage                        
         
         if hasattr(c, 'replace_for_trimmed'):
-            data_sets = trimmed_storage[c.replace_for_trimmed]
+            data_sets = {key: dt.materialize(df) for key, df in trimmed_storage[c.replace_for_trimmed].items()}
     #---------------------------------------------------------------------
 
     #### QUERYING (analogous process to trimming)
+    # Queried versions are views of the rows of the data sets, evaluated when they are first used.
     if hasattr(c, 'query_container'):
         filter = dt.Filter_Data()
 
@@ -288,7 +404,7 @@ def main() -> None:
                 raise Exception("Could not find a valid expression for 'df'.")
             
             for df in to_query:
-                queried = filter.filter_data(
+                queried = filter.filter_view(
                     df=data_sets[df],
                     query=full_dic['query'],
                     )
@@ -306,7 +422,7 @@ def main() -> None:
         all_data_sets['query'] = queried_storage                        
 
         if hasattr(c, 'replace_for_queried'):
-            data_sets = queried_storage[c.replace_for_queried] 
+            data_sets = {key: dt.materialize(df) for key, df in queried_storage[c.replace_for_queried].items()}
     #---------------------------------------------------------------------
 
     if hasattr(c, 'summary_after_transformation'):
@@ -318,12 +434,12 @@ def main() -> None:
             if c.summary_after_transformation is True:
                 set_name = 'train'
                 print(f'#### Variables After Transformation ({set_name}):\n')
-                summary_stats_2 = data_sets['train'].info()
+                summary_stats_2 = profiles.get('train', data_sets['train']).info()
 
             if c.summary_after_transformation in data_sets_names:
                 set_name = c.summary_after_transformation
                 print(f'#### Variables After Transformation ({set_name}):\n')
-                summary_stats_2 = data_sets[c.summary_after_transformation].info()
+                summary_stats_2 = profiles.get(set_name, data_sets[set_name]).info()
 
         if split is False:
             if not isinstance(c.summary_after_transformation, bool) and\
@@ -333,7 +449,7 @@ def main() -> None:
             if (c.summary_after_transformation is True) or (c.summary_after_transformation in ['main', 'train']):
                 set_name = 'main'
                 print(f'#### Variables After Transformation ({set_name}):\n')
-                summary_stats_2 = data_sets['train'].info()
+                summary_stats_2 = profiles.get('train', data_sets['train']).info()
 
     if hasattr(c, 'data_view_2'):
         full_dic = ut.unfold_dictionary(c.data_view_2, viewer.View_Data.keys)
@@ -366,7 +482,7 @@ def main() -> None:
     print('\n')
 
     if hasattr(c, 'data_description_2'):
-        print(sa.describe_data(data_sets, c.data_description_2), '\n')
+        print(sa.describe_data(data_sets, c.data_description_2, profiles), '\n')
 
 
     #### VISUALIZATION
@@ -461,7 +577,10 @@ def main() -> None:
             
     if hasattr(c, 'heat_map'):
         heatmap = dv.Heat_Map(c.heat_map, split)                
-        heatmap.display_heat_map(data_sets)
+        heatmap.display_heat_map(
+            data_sets,
+            profiles.get(heatmap.df_hp, data_sets[heatmap.df_hp], sa.Covariance_Accumulator.from_frame),
+            )
 
     if (not hasattr(c, 'display_panels')) and\
         (hasattr(c, 'histograms') or hasattr(c, 'boxplots') or hasattr(c, 'scatterplots') or hasattr(c, 'heatmap')):
@@ -470,7 +589,12 @@ def main() -> None:
     #-------------------------------------------------------------------------------------------
 
     print('\nChecking Non-numerical Variables:')
-    non_numeric = dc.check_if_numeric(data_sets['train'], data_sets['train'].columns, True)
+    non_numeric = dc.check_if_numeric(
+        data_sets['train'],
+        data_sets['train'].columns,
+        True,
+        profiles.get('train', data_sets['train']),
+        )
     if non_numeric:
         print('\n    - Non-numeric variables in the main data frame:')
         for col in non_numeric:
@@ -485,26 +609,32 @@ def main() -> None:
     if c.correlations:
         if split is False:
             if (c.correlations) or (c.correlations == 'main') or (c.correlations == 'train'):
-                corr_set_to_print = data_sets['train']
+                corr_set_key = 'train'
                 set_name = 'main'
 
         if split:
             if c.correlations is True:
-                corr_set_to_print = data_sets['train']
+                corr_set_key = 'train'
                 set_name = 'train'
 
             if c.correlations in all_sets_names:
-                corr_set_to_print = data_sets[c.correlations]
+                corr_set_key = c.correlations
                 set_name = c.correlations
 
+        corr_set_to_print = data_sets[corr_set_key]
+
         print(f"Pearson's Correlations ({set_name})\n")
-        print(sa.correlation_table(corr_set_to_print))
+        print(sa.correlation_table(
+            corr_set_to_print,
+            profiles.get(corr_set_key, corr_set_to_print, sa.Covariance_Accumulator.from_frame),
+            ))
 
 
     if hasattr(c, 'x_var_container_vif'):
         print('\n\n## Analysis Of Variance Inflation Factor: \n')
         vif_obj = sa.VIF()
         vif_obj.df = data_sets['train']
+        vif_obj.covariance = profiles.get('train', data_sets['train'], sa.Covariance_Accumulator.from_frame)
         vif_obj.X = c.x_var_container_vif
         vif_obj.store_vif()
         vif_obj.print_vif_container()
@@ -522,6 +652,8 @@ def main() -> None:
         print('\n#### Feature Selection Algorithms\n')
         selector = fs.Feat_Selector()
         selector.df = data_sets['train']
+        selector.profile = profiles.get('train', data_sets['train'])
+        selector.covariance = profiles.get('train', data_sets['train'], sa.Covariance_Accumulator.from_frame)
 
         # Check if features are numeric when piped directly from the main DataFrame.
         if hasattr(c, 'target_container'):
@@ -574,6 +706,16 @@ def main() -> None:
         run_reg = lr.RunRegressions()
         run_reg.train = train
         run_reg.validation = validation
+        # Frames the models are estimated on (before standardization and `drop_non_numeric`); the
+        # cross validation and the walk-forward evaluation use them too, so their errors are on the
+        # same scale as the error comparison and the bootstrap.
+        regression_sets = {'main': main, 'train': train, 'validation': validation, 'test': test} if split else {'train': main}
+        regression_sets = {key: df for key, df in regression_sets.items() if df is not None}
+
+        if hasattr(c, 'result_storage'):
+            storage_parameters = ut.unfold_dictionary(c.result_storage, lr.Regression_Result.keys)
+            run_reg.spill_mb = storage_parameters['spill_mb']
+            run_reg.spill_dir = storage_parameters['spill_dir']
 
         if c.plug_feature_selection and (check_fs_algorithms is False):
             raise Exception('No feature selection process took place. To continue without estimating models that resulted from a feature selection process, set `plug_feature_selection = False`.')
@@ -602,13 +744,79 @@ def main() -> None:
     
         run_reg.print_summary()
         run_reg.produce_all_results()
-        run_reg.print_all_results(c.residuals_analysis, c.residuals_set)
+        residual_tests = None
+        if hasattr(c, 'residual_tests'):
+            residual_tests = ut.unfold_dictionary(c.residual_tests, st.Residual_Tests.keys)
+        run_reg.print_all_results(c.residuals_analysis, c.residuals_set, residual_tests)
+
+        if hasattr(c, 'influence'):
+            influence_parameters = ut.unfold_dictionary(c.influence, st.Influence.keys)
+            print('\n## Influential Observations (train set)\n')
+            run_reg.influence(influence_parameters['top_k'], influence_parameters['sort_by'])
+            run_reg.print_influence_results()
+            print('\n')
 
         if c.error_comparison:
             print('\n## Error Measurement Comparison\n')
             run_reg.compare_error_results()
             print('\n')
 
+        if hasattr(c, 'cross_validation'):
+            cv_parameters = ut.unfold_dictionary(c.cross_validation, ds.Cross_Validation.keys)
+            cv_set = cv_parameters['df'] or 'train'
+            if cv_set not in regression_sets:
+                raise Exception(f"`df` in `cross_validation` must be one of the available data sets: {', '.join(regression_sets)}.")
+
+            cv = ds.Cross_Validation(
+                cv_parameters['method'],
+                cv_parameters['n_splits'],
+                cv_parameters['n_repeats'],
+                cv_parameters['shuffle'],
+                cv_parameters['rand_state'],
+                cv_parameters['target'],
+                cv_parameters['bins'],
+                cv_parameters['groups'],
+                )
+
+            print(f'\n## Cross Validation ({cv.description()}, {cv_set} set, variables as in the regression results)\n')
+            run_reg.cross_validate(regression_sets[cv_set], cv, cv_parameters['n_jobs'])
+            run_reg.compare_cv_results()
+            print('\n')
+
+        if hasattr(c, 'walk_forward'):
+            walk_forward_parameters = ut.unfold_dictionary(c.walk_forward, ds.Walk_Forward.keys)
+            # The rows of the split sets are shuffled; by default the walk-forward runs on the main set.
+            walk_forward_set = walk_forward_parameters['df'] or ('main' if split else 'train')
+            if walk_forward_set not in regression_sets:
+                raise Exception(f"`df` in `walk_forward` must be one of the available data sets: {', '.join(regression_sets)}.")
+
+            splitter = ds.Walk_Forward(
+                walk_forward_parameters['window'],
+                walk_forward_parameters['initial_rows'],
+                walk_forward_parameters['test_rows'],
+                walk_forward_parameters['step'],
+                walk_forward_parameters['gap'],
+                )
+
+            print(f"\n## Walk-Forward Evaluation ({splitter.window} window, {walk_forward_set} set, variables as in the regression results)\n")
+            run_reg.walk_forward(regression_sets[walk_forward_set], splitter)
+            print(f"Origins: {len(run_reg.walk_forward_store[0]['mse'])}\n")
+            run_reg.compare_cv_results(run_reg.walk_forward_store)
+            print('\n')
+
+        if hasattr(c, 'bootstrap'):
+            bootstrap_parameters = ut.unfold_dictionary(c.bootstrap, ds.Bootstrap.keys)
+            resampler = ds.Bootstrap(
+                bootstrap_parameters['n_resamples'],
+                bootstrap_parameters['rand_state'],
+                bootstrap_parameters['batch_size'],
+                )
+
+            print(f'\n## Bootstrap ({resampler.n_resamples} replicates of the train set)\n')
+            run_reg.bootstrap(resampler, bootstrap_parameters['confidence'], bootstrap_parameters['n_jobs'])
+            run_reg.print_bootstrap_results()
+            print('\n')
+
 
     if hasattr(c, 'dataset_name'):
         data_sets['train'].to_csv(f'{DataPath.DATASET_PATH}/{c.dataset_name}')
@@ -2,6 +2,7 @@ from typing import Union
 
 from pandas.api.types import is_numeric_dtype
 
+import weakref
 import pandas as pd
 import numpy as np
 
@@ -9,13 +10,17 @@ import numpy as np
 def check_if_numeric(
         df: pd.core.frame.DataFrame,
         columns: Union[list, None],
-        show_not_numeric: bool
+        show_not_numeric: bool,
+        profile: Union['Data_Profile', None] = None,
     ):
 
     if columns is None:
         columns = df.columns
 
-    is_numeric = [is_numeric_dtype(df[col]) for col in columns]
+    if profile is not None:
+        is_numeric = [bool(profile.table.loc[col, 'numeric']) for col in columns]
+    else:
+        is_numeric = [is_numeric_dtype(df[col]) for col in columns]
 
     if (all(is_numeric) is False) and (show_not_numeric is True):
         non_numeric = []
@@ -25,4 +30,364 @@ def check_if_numeric(
 
         return non_numeric
 
-    return None
\ No newline at end of file
+    return None
+
+
+class Data_Profile:
+    """Column statistics computed together: dtype, missing values, count, mean, standard deviation,
+    minimum, maximum, number of unique values, whether the column is constant and whether it is
+    numeric. The numeric columns are converted into a single float block, from which the counts,
+    moments and extremes are read in one pass; they are kept as a `Summary_Accumulator` (`summary`),
+    which serves `describe()` and the statistics of the trims and replacements.
+    """
+
+    def __init__(self, df: pd.core.frame.DataFrame):
+        self.shape = df.shape
+        self.columns = list(df.columns)
+        self.dtypes = df.dtypes
+        self.index = df.index
+        self.memory_usage = df.memory_usage(index=True, deep=False).sum()
+        self.has_object = any(dtype == object for dtype in df.dtypes) or (df.index.dtype == object)
+
+        # Columns summarized by `DataFrame.describe()` (booleans are not included).
+        self.described = list(df.select_dtypes(include=[np.number]).columns)
+
+        table = pd.DataFrame(
+            index=pd.Index(self.columns, dtype=object),
+            columns=['dtype', 'na', 'cardinality', 'constant', 'numeric'] + Summary_Accumulator.moments,
+            dtype=object,
+            )
+        table['dtype'] = list(df.dtypes)
+        table['numeric'] = [is_numeric_dtype(df[col]) for col in self.columns]
+        table['cardinality'] = df.nunique()
+        table['constant'] = table['cardinality'] <= 1
+
+        self.summary = Summary_Accumulator.from_values(
+            self.described,
+            df[self.described].to_numpy(dtype=np.float64),
+            df,
+            )
+        if self.described:
+            table.loc[self.described, Summary_Accumulator.moments] = self.summary.moments_block().T
+            table.loc[self.described, 'na'] = (self.shape[0] - self.summary.count).astype(np.int64)
+
+        for col in self.columns:
+            if col not in self.described:
+                table.loc[col, 'na'] = df[col].isna().sum()
+
+        self.table = table
+
+    def describe(self) -> pd.core.frame.DataFrame:
+        """Equivalent to `DataFrame.describe()` for data frames with at least one numeric column."""
+
+        return self.summary.describe()
+
+    def na_counts(self) -> pd.core.series.Series:
+        """Equivalent to `DataFrame.isna().sum()`."""
+
+        return self.table['na'].astype(np.int64).rename(None)
+
+    def constant_columns(self, columns: Union[list, None] = None) -> list:
+        if columns is None:
+            columns = self.columns
+
+        return [col for col in columns if self.table.loc[col, 'constant']]
+
+    def info(self) -> None:
+        """Prints the same summary as `DataFrame.info()`, using the stored counts of missing values."""
+
+        print("<class 'pandas.core.frame.DataFrame'>")
+
+        if isinstance(self.index, pd.RangeIndex):
+            if len(self.index) > 0:
+                print(f'RangeIndex: {len(self.index)} entries, {self.index[0]} to {self.index[-1]}')
+            else:
+                print('RangeIndex: 0 entries')
+        else:
+            print(self.index._summary())
+
+        print(f'Data columns (total {len(self.columns)} columns):')
+
+        rows = [[' #', 'Column', 'Non-Null Count', 'Dtype'], ['---', '------', '--------------', '-----']]
+        for i, col in enumerate(self.columns):
+            rows.append([
+                f' {i}',
+                str(col),
+                f"{self.shape[0] - self.table.loc[col, 'na']} non-null",
+                str(self.dtypes[col]),
+                ])
+
+        widths = [max(len(row[j]) for row in rows) for j in range(4)]
+        for row in rows:
+            print('  '.join(value.ljust(widths[j]) for j, value in enumerate(row)))
+
+        dtype_counts = pd.Series([dtype.name for dtype in self.dtypes]).value_counts().sort_index()
+        print(f"dtypes: {', '.join(f'{name}({count})' for name, count in dtype_counts.items())}")
+
+        memory = self.memory_usage
+        qualifier = '+' if self.has_object else ''
+        for unit in ['bytes', 'KB', 'MB', 'GB', 'TB']:
+            if memory < 1024.0:
+                print(f'memory usage: {memory:3.1f}{qualifier} {unit}')
+                break
+            memory /= 1024.0
+
+        return
+
+
+class Quantile_Sketch:
+    """Mergeable quantile sketch (KLL) of one column. Values are kept in levels; an item in level h
+    stands for 2**h values. When a level exceeds its capacity (`k` for the top level, 2/3 of the
+    level above for the others) it is sorted and every other item, starting at a random offset, is
+    promoted to the next level. Until the first compaction (at most `k` values) the sketch holds every
+    value and the quantiles are exact; afterwards the rank of a returned quantile differs from the
+    requested one by about 2.3 / k**0.97 of the number of values (99% confidence), i.e. about 0.14%
+    with the default `k` of 2000.
+    """
+
+    def __init__(self, k: int = 2000, seed: int = 0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+
+        return max(2, int(np.ceil(self.k * (2 / 3)**depth)))
+
+    def compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self.capacity(level):
+                level += 1
+                continue
+
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # With an odd number of items the largest stays, so the total weight is preserved.
+            even = len(items) - len(items) % 2
+            promoted = items[self.rng.integers(2):even:2]
+            self.levels[level] = items[even:]
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            # Adding a level lowers the capacity of the levels below.
+            level = 0
+
+        return
+
+    def update(self, values: np.ndarray) -> 'Quantile_Sketch':
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.compress()
+
+        return self
+
+    def merge(self, other: 'Quantile_Sketch') -> 'Quantile_Sketch':
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.compress()
+
+        return self
+
+    def quantile(self, q: Union[float, list]) -> Union[float, np.ndarray]:
+        """Linear interpolation between order statistics, as `Series.quantile` (exact while no
+        compaction has taken place)."""
+
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0**level) for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, weights = items[order], weights[order]
+        # Each item stands for a run of consecutive ranks; it is placed at the centre of its run.
+        positions = np.cumsum(weights) - (weights + 1) / 2
+
+        return np.interp(np.asarray(q) * (self.count - 1), positions, items)
+
+
+class Summary_Accumulator:
+    """Count, mean, standard deviation, minimum, maximum and quartiles of the numeric columns of a
+    data set (the `describe()` table), accumulated chunk by chunk. Means and sums of squared
+    deviations are combined with the pairwise update of Chan et al., extremes exactly, and quantiles
+    with one `Quantile_Sketch` per column, so accumulators of different chunks (e.g. computed by
+    worker processes) can be combined with `merge`. Quantiles are exact for columns with at most `k`
+    values, and always exact for an accumulator of a whole data frame in memory (`from_values`),
+    whose quantiles are read from the data frame until it is updated or merged.
+    """
+
+    statistics = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+    moments = ['count', 'mean', 'std', 'min', 'max']
+
+    def __init__(self, columns: list, k: int = 2000):
+        self.columns = list(columns)
+        n = len(self.columns)
+        self.count = np.zeros(n)
+        self.mean = np.zeros(n)
+        self.m2 = np.zeros(n)
+        self.minimum = np.full(n, np.nan)
+        self.maximum = np.full(n, np.nan)
+        self.sketches = [Quantile_Sketch(k, seed) for seed in range(n)]
+        # Data frame the exact quantiles are read from (weak reference), see `from_values`.
+        self.frame = None
+
+    def from_frame(df: pd.core.frame.DataFrame, chunk_rows: int = 200_000) -> 'Summary_Accumulator':
+        """Accumulator of the columns summarized by `DataFrame.describe()`, built chunk by chunk."""
+
+        accumulator = Summary_Accumulator(list(df.select_dtypes(include=[np.number]).columns))
+        for start in range(0, df.shape[0], chunk_rows):
+            accumulator.update(df.iloc[start:start + chunk_rows])
+
+        return accumulator
+
+    def from_values(columns: list, values: np.ndarray, df: pd.core.frame.DataFrame) -> 'Summary_Accumulator':
+        """Accumulator of the float block `values` of the `columns` of `df` (e.g. the block of
+        `Data_Profile`). The sketches are only filled if the accumulator is updated or merged.
+        """
+
+        accumulator = Summary_Accumulator(columns)
+        accumulator.combine(*Summary_Accumulator.block_moments(values))
+        accumulator.frame = weakref.ref(df)
+
+        return accumulator
+
+    def block_moments(values: np.ndarray) -> tuple:
+        count = (~np.isnan(values)).sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, np.nansum(values, axis=0) / count, 0.0)
+            m2 = np.nansum((values - mean)**2, axis=0)
+        minimum = np.where(count > 0, np.fmin.reduce(values, axis=0, initial=np.inf), np.nan)
+        maximum = np.where(count > 0, np.fmax.reduce(values, axis=0, initial=-np.inf), np.nan)
+
+        return (count, mean, m2, minimum, maximum)
+
+    def combine(self, count: np.ndarray, mean: np.ndarray, m2: np.ndarray, minimum: np.ndarray, maximum: np.ndarray) -> None:
+        total = self.count + count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = mean - self.mean
+            weight = np.where(total > 0, count / total, 0.0)
+            self.m2 = self.m2 + m2 + delta**2 * self.count * weight
+            self.mean = self.mean + delta * weight
+        self.count = total
+        self.minimum = np.fmin(self.minimum, minimum)
+        self.maximum = np.fmax(self.maximum, maximum)
+
+        return
+
+    def summarized_frame(self) -> pd.core.frame.DataFrame:
+        df = self.frame()
+        if df is None:
+            raise Exception('The data frame summarized by the accumulator no longer exists.')
+
+        return df
+
+    def fill_sketches(self) -> None:
+        """Moves the values of the data frame into the sketches, before other data is added."""
+
+        if self.frame is None:
+            return
+
+        df = self.summarized_frame()
+        for col, sketch in zip(self.columns, self.sketches):
+            sketch.update(df[col].to_numpy(dtype=np.float64))
+        self.frame = None
+
+        return
+
+    def update(self, chunk: pd.core.frame.DataFrame) -> 'Summary_Accumulator':
+        self.fill_sketches()
+
+        values = chunk[self.columns].to_numpy(dtype=np.float64)
+        self.combine(*Summary_Accumulator.block_moments(values))
+        for i, sketch in enumerate(self.sketches):
+            sketch.update(values[:, i])
+
+        return self
+
+    def merge(self, other: 'Summary_Accumulator') -> 'Summary_Accumulator':
+        if other.columns != self.columns:
+            raise Exception('Only accumulators of the same columns can be merged.')
+
+        self.fill_sketches()
+        other.fill_sketches()
+
+        self.combine(other.count, other.mean, other.m2, other.minimum, other.maximum)
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+
+        return self
+
+    def quantile(self, column: str, q: Union[float, list]) -> Union[float, np.ndarray]:
+        if self.frame is None:
+            return self.sketches[self.columns.index(column)].quantile(q)
+
+        # Same linear interpolation as `Series.quantile`.
+        values = self.summarized_frame()[column].to_numpy(dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+
+        return np.quantile(values, q)
+
+    def variance(self, column: str, ddof: int = 1) -> float:
+        i = self.columns.index(column)
+
+        return self.m2[i] / (self.count[i] - ddof) if self.count[i] > ddof else np.nan
+
+    def moments_block(self) -> np.ndarray:
+        """Rows count, mean, std, min and max (columns in the order of `columns`)."""
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(self.count > 0, self.mean, np.nan)
+            std = np.sqrt(np.where(self.count > 1, self.m2 / (self.count - 1), np.nan))
+
+        return np.vstack([self.count, mean, std, self.minimum, self.maximum])
+
+    def describe(self) -> pd.core.frame.DataFrame:
+        """Same table as `DataFrame.describe()` (for merged or chunked accumulators, quartiles within
+        the error bound of the sketches)."""
+
+        count, mean, std, minimum, maximum = self.moments_block()
+        quartiles = np.array([self.quantile(col, [0.25, 0.5, 0.75]) for col in self.columns]).reshape(-1, 3).T
+
+        block = np.vstack([count, mean, std, minimum, *quartiles, maximum])
+
+        return pd.DataFrame(block, index=Summary_Accumulator.statistics, columns=self.columns)
+
+
+class Profile_Store:
+    """Keeps one `Data_Profile` per data set name, so the stages that need column statistics share a
+    single pass over the data. Other statistics computed from a whole data frame (e.g. the covariance
+    accumulator of `statistical_analysis`) can be kept as well by passing the function that builds
+    them as `build`. A profile is recomputed when a different data frame (or one with other columns)
+    is stored under the same name; in-place changes must be signalled with `invalidate`.
+    """
+
+    def __init__(self):
+        self.profiles: dict = {}
+
+    def get(self, name: str, df: pd.core.frame.DataFrame, build=Data_Profile):
+        key = (name, build)
+        if key in self.profiles:
+            reference, shape, columns, profile = self.profiles[key]
+            if (reference() is df) and (shape == df.shape) and (columns == list(df.columns)):
+                return profile
+
+        profile = build(df)
+        self.profiles[key] = (weakref.ref(df), df.shape, list(df.columns), profile)
+
+        return profile
+
+    def invalidate(self, name: Union[str, None] = None) -> None:
+        if name is None:
+            self.profiles = {}
+        else:
+            self.profiles = {key: value for key, value in self.profiles.items() if key[0] != name}
+
+        return
@@ -3,7 +3,10 @@ from typing import Union, Iterable
 import pandas as pd
 import numpy as np
 
-from sklearn.model_selection import train_test_split as split
+
+class Split_Data:
+    keys = ['rand_state', 'proportions', 'shuffle', 'method', 'key']
+
 
 def split_data(
     df: pd.core.frame.DataFrame,
@@ -12,6 +15,8 @@ def split_data(
     shuffle: Union[bool, int] = True,
     ) -> tuple:
 
+    from sklearn.model_selection import train_test_split as split
+
     if isinstance(rand_state, int):
         rand_state_1, rand_state_2 = (rand_state, rand_state)
     elif isinstance(rand_state, (tuple, list)) and len(rand_state)==2:
@@ -86,7 +91,16 @@ def split_data(
         )
 
 
-def print_proportions(data_sets: dict) -> pd.core.frame.DataFrame:
+def print_proportions(data_sets: Union[dict, np.ndarray]) -> pd.core.frame.DataFrame:
+    """Rows and proportion of each data set; `data_sets` can also be the split assignment of each
+    row (see `Hash_Split.assign`).
+    """
+
+    if isinstance(data_sets, np.ndarray):
+        rows_length = np.bincount(data_sets, minlength=len(Hash_Split.names))
+        sizes = dict(zip(Hash_Split.names, rows_length.tolist()))
+        data_sets = {'main': pd.DataFrame(index=range(len(data_sets)))}
+        data_sets.update({name: pd.DataFrame(index=range(size)) for name, size in sizes.items()})
 
     if len(data_sets) == 1:
         data_sets = {'main': data_sets['train']}
@@ -102,4 +116,297 @@ def print_proportions(data_sets: dict) -> pd.core.frame.DataFrame:
         index=data_sets.keys()
     )
 
-    return proportions_ds
\ No newline at end of file
+    return proportions_ds
+
+
+class Hash_Split:
+    """Deterministic split in which the set of each row (0: train, 1: validation, 2: test) depends only
+    on that row: on the hash of its value in the `key` column or, without a key, on its row number,
+    mixed with `rand_state`. The assignment is reproducible across runs and does not require shuffling
+    (or holding) the whole data frame, so it can be computed chunk by chunk (see `assign_chunks`).
+    Rows with the same key always fall in the same set. The proportions are reached in expectation
+    rather than exactly.
+    """
+
+    names = ['train', 'validation', 'test']
+
+    def __init__(
+            self,
+            proportions: Union[float, Iterable],
+            key: Union[str, None] = None,
+            rand_state: Union[int, None] = None,
+            ):
+
+        if isinstance(proportions, float):
+            proportions = [proportions]
+        proportions = list(proportions)
+        if (len(proportions) == 0) or (len(proportions) > 2) or (sum(proportions) > 1):
+            raise Exception('`proportions` takes the train size, or the train and validation sizes (adding up to 1 at most).')
+        if len(proportions) == 1:
+            proportions.append(1 - proportions[0])
+
+        self.bounds = np.cumsum(proportions)
+        # Without a test set every row above the train bound belongs to the validation set.
+        self.test = bool(self.bounds[-1] < 1 - 1e-9)
+        if self.test is False:
+            self.bounds[-1] = np.inf
+        self.key = key
+        self.rand_state = 0 if rand_state is None else rand_state
+
+    def mix(values: np.ndarray) -> np.ndarray:
+        """SplitMix64 finalizer: spreads any 64 bit values uniformly over 64 bits."""
+
+        z = values + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+
+        return z ^ (z >> np.uint64(31))
+
+    def assign(self, df: pd.core.frame.DataFrame, start: int = 0) -> np.ndarray:
+        """Set of each row of `df`; `start` is the row number of its first row in the full data."""
+
+        if self.key is None:
+            values = np.arange(start, start + df.shape[0], dtype=np.uint64)
+        else:
+            values = pd.util.hash_pandas_object(df[self.key], index=False).to_numpy()
+
+        seed = Hash_Split.mix(np.array([self.rand_state], dtype=np.uint64))
+        hashed = Hash_Split.mix(values ^ seed)
+        uniform = (hashed >> np.uint64(11)) * (1.0 / (1 << 53))
+
+        return np.searchsorted(self.bounds, uniform, side='right').astype(np.uint8)
+
+    def assign_chunks(self, chunks: Iterable):
+        """Yields the assignment of each chunk of a data set read in chunks."""
+
+        start = 0
+        for chunk in chunks:
+            yield self.assign(chunk, start)
+            start += chunk.shape[0]
+
+    def split(self, df: pd.core.frame.DataFrame) -> tuple:
+        """Train, validation and test data frames, as returned by `split_data`."""
+
+        assignments = self.assign(df)
+
+        return tuple(
+            df.take(np.flatnonzero(assignments == i)).reset_index(drop=True) if (i < 2) or self.test else pd.DataFrame()
+            for i in range(3)
+            )
+
+
+class Cross_Validation:
+    """K-fold cross validation splitter. Folds are described by an array with the fold of each row
+    (one row per repetition), from which the positional indices of the train and test rows of each
+    fold are taken; the data frame itself is never copied. Methods:
+        - 'kfold': consecutive blocks of rows, after shuffling when `shuffle` is activated.
+        - 'stratified': the `target` is divided into `bins` quantile bins and the rows of each bin are
+          spread evenly across the folds.
+        - 'group': all rows with the same value of `groups` are kept in the same fold; the largest
+          groups are placed first, each in the fold with the fewest rows.
+    With `n_repeats` above 1 the 'kfold' and 'stratified' folds are drawn again with independent seeds
+    (repeated k-fold).
+    """
+
+    keys = ['method', 'n_splits', 'n_repeats', 'shuffle', 'rand_state', 'target', 'bins', 'groups', 'df', 'n_jobs']
+    methods = ['kfold', 'stratified', 'group']
+
+    def __init__(
+            self,
+            method: Union[str, None] = None,
+            n_splits: Union[int, None] = None,
+            n_repeats: Union[int, None] = None,
+            shuffle: Union[bool, None] = None,
+            rand_state: Union[int, None] = None,
+            target: Union[str, None] = None,
+            bins: Union[int, None] = None,
+            groups: Union[str, None] = None,
+            ):
+
+        self.method = method or 'kfold'
+        self.n_splits = 5 if n_splits is None else n_splits
+        self.n_repeats = 1 if n_repeats is None else n_repeats
+        self.shuffle = (self.n_repeats > 1) if shuffle is None else shuffle
+        self.rand_state = rand_state
+        self.target = target
+        self.bins = 5 if bins is None else bins
+        self.groups = groups
+
+        if self.method not in Cross_Validation.methods:
+            raise Exception(f"`method` must be one of the following: {', '.join(Cross_Validation.methods)}.")
+        if (isinstance(self.n_splits, int) is False) or (self.n_splits < 2):
+            raise Exception('`n_splits` must be an integer equal or greater than 2.')
+        if (isinstance(self.n_repeats, int) is False) or (self.n_repeats < 1):
+            raise Exception('`n_repeats` must be a positive integer.')
+        if (self.n_repeats > 1) and ((self.shuffle is False) or (self.method == 'group')):
+            raise Exception("Repeated cross validation requires shuffled 'kfold' or 'stratified' folds.")
+        if (self.method == 'stratified') and (self.target is None):
+            raise Exception("The 'stratified' method requires a `target`.")
+        if (self.method == 'group') and (self.groups is None):
+            raise Exception("The 'group' method requires a `groups` variable.")
+
+    def description(self) -> str:
+        repeats = f', {self.n_repeats} repeats' if self.n_repeats > 1 else ''
+
+        return f'{self.method}, {self.n_splits} folds{repeats}'
+
+    def assignments(self, df: pd.core.frame.DataFrame) -> np.ndarray:
+        """Fold of each row, with shape (n_repeats, rows)."""
+
+        n = df.shape[0]
+        if n < self.n_splits:
+            raise Exception(f'There are fewer rows ({n}) than folds ({self.n_splits}).')
+
+        seeds = np.random.SeedSequence(self.rand_state).spawn(self.n_repeats)
+        folds = np.empty((self.n_repeats, n), dtype=np.int64)
+
+        for repeat, seed in enumerate(seeds):
+            rng = np.random.default_rng(seed)
+
+            if self.method == 'kfold':
+                order = rng.permutation(n) if self.shuffle else np.arange(n)
+                # As in scikit-learn, the first `n % n_splits` folds have one more row.
+                sizes = np.full(self.n_splits, n // self.n_splits)
+                sizes[:n % self.n_splits] += 1
+                folds[repeat, order] = np.repeat(np.arange(self.n_splits), sizes)
+
+            if self.method == 'stratified':
+                y = df[self.target].to_numpy(dtype=np.float64)
+                if np.isnan(y).any():
+                    raise Exception(f"The stratification target '{self.target}' has missing values.")
+                ranks = np.empty(n, dtype=np.int64)
+                ranks[np.argsort(y, kind='stable')] = np.arange(n)
+                quantile_bin = ranks * self.bins // n
+                # Rows ordered by bin (shuffled within each bin) are dealt to the folds in turn.
+                within = rng.permutation(n) if self.shuffle else np.arange(n)
+                order = np.lexsort((within, quantile_bin))
+                folds[repeat, order] = np.arange(n) % self.n_splits
+
+            if self.method == 'group':
+                codes, uniques = pd.factorize(df[self.groups], use_na_sentinel=False)
+                if len(uniques) < self.n_splits:
+                    raise Exception(f"There are fewer groups in '{self.groups}' ({len(uniques)}) than folds ({self.n_splits}).")
+                sizes = np.bincount(codes, minlength=len(uniques))
+                group_fold = np.empty(len(uniques), dtype=np.int64)
+                fold_sizes = np.zeros(self.n_splits, dtype=np.int64)
+                for group in np.argsort(-sizes, kind='stable'):
+                    fold = np.argmin(fold_sizes)
+                    group_fold[group] = fold
+                    fold_sizes[fold] += sizes[group]
+                folds[repeat] = group_fold[codes]
+
+        return folds
+
+    def split(self, df: pd.core.frame.DataFrame):
+        """Yields the positional indices `(train, test)` of each fold (every repetition in turn)."""
+
+        for folds in self.assignments(df):
+            for fold in range(self.n_splits):
+                test = folds == fold
+                yield (np.flatnonzero(~test), np.flatnonzero(test))
+
+
+class Bootstrap:
+    """Bootstrap resampling described by replicate weights: a count matrix (replicates x rows) with the
+    number of times each row is drawn in each replicate. Replicates are drawn in batches of
+    `batch_size`, each batch with its own seed spawned from `rand_state`, so the results are the same
+    whether the batches run in one process or in several. By default the batches are sized so that a
+    count matrix holds about 16 million entries (at most 256 replicates).
+    """
+
+    keys = ['n_resamples', 'rand_state', 'batch_size', 'confidence', 'n_jobs']
+
+    def __init__(
+            self,
+            n_resamples: Union[int, None] = None,
+            rand_state: Union[int, None] = None,
+            batch_size: Union[int, None] = None,
+            ):
+
+        self.n_resamples = 1000 if n_resamples is None else n_resamples
+        self.rand_state = rand_state
+        self.batch_size = batch_size
+
+        if (isinstance(self.n_resamples, int) is False) or (self.n_resamples < 2):
+            raise Exception('`n_resamples` must be an integer equal or greater than 2.')
+        if (self.batch_size is not None) and ((isinstance(self.batch_size, int) is False) or (self.batch_size < 1)):
+            raise Exception('`batch_size` must be a positive integer.')
+
+    def batches(self, n: int) -> list:
+        """Seed and number of replicates of each batch, for a data set with `n` rows."""
+
+        size = self.batch_size or max(1, min(256, 16_000_000 // max(n, 1)))
+        sizes = [size] * (self.n_resamples // size)
+        if self.n_resamples % size:
+            sizes.append(self.n_resamples % size)
+        seeds = np.random.SeedSequence(self.rand_state).spawn(len(sizes))
+
+        return list(zip(seeds, sizes))
+
+    def counts(n: int, seed: np.random.SeedSequence, size: int) -> np.ndarray:
+        """Count matrix of one batch: `size` samples of `n` rows drawn with replacement."""
+
+        rng = np.random.default_rng(seed)
+        counts = np.empty((size, n), dtype=np.int32)
+        for replicate in range(size):
+            counts[replicate] = np.bincount(rng.integers(0, n, n), minlength=n)
+
+        return counts
+
+
+class Walk_Forward:
+    """Rolling-origin (walk-forward) splitter for data ordered in time. The first `initial_rows` rows
+    are used for training and the following `test_rows` for testing; the origin then moves `step`
+    rows forward. With the 'expanding' window the train set keeps every row before the origin, with
+    the 'sliding' window only the last `initial_rows`. `gap` rows between the train and the test rows
+    are left out (e.g. to keep lagged or rolling features of the test rows from overlapping the
+    train rows). Rows are never shuffled and the folds are returned as ranges of row positions.
+    """
+
+    keys = ['window', 'initial_rows', 'test_rows', 'step', 'gap', 'df']
+    windows = ['expanding', 'sliding']
+
+    def __init__(
+            self,
+            window: Union[str, None] = None,
+            initial_rows: Union[int, None] = None,
+            test_rows: Union[int, None] = None,
+            step: Union[int, None] = None,
+            gap: Union[int, None] = None,
+            ):
+
+        self.window = window or 'expanding'
+        self.initial_rows = initial_rows
+        self.test_rows = test_rows
+        self.step = step
+        self.gap = 0 if gap is None else gap
+
+        if self.window not in Walk_Forward.windows:
+            raise Exception(f"`window` must be one of the following: {', '.join(Walk_Forward.windows)}.")
+        for name in ['initial_rows', 'test_rows', 'step']:
+            value = getattr(self, name)
+            if (value is not None) and ((isinstance(value, int) is False) or (value < 1)):
+                raise Exception(f'`{name}` must be a positive integer.')
+        if (isinstance(self.gap, int) is False) or (self.gap < 0):
+            raise Exception('`gap` must be a non-negative integer.')
+
+    def split(self, n: int) -> list:
+        """Train and test `range`s of every origin, for a data set with `n` rows. By default the first
+        half of the rows is the initial train set and each test set has a twentieth of the rows.
+        """
+
+        initial_rows = self.initial_rows or n // 2
+        test_rows = self.test_rows or max(1, n // 20)
+        step = self.step or test_rows
+
+        folds = []
+        origin = initial_rows
+        while origin + self.gap + test_rows <= n:
+            start = 0 if self.window == 'expanding' else origin - initial_rows
+            folds.append((range(start, origin), range(origin + self.gap, origin + self.gap + test_rows)))
+            origin += step
+
+        if len(folds) == 0:
+            raise Exception(f'There are not enough rows ({n}) for one train set of {initial_rows} rows, a gap of {self.gap} and a test set of {test_rows} rows.')
+
+        return folds
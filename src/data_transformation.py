@@ -1,4 +1,4 @@
-from typing import Union, Iterable
+from typing import Union, Iterable, Callable
 
 import re
 import pandas as pd 
@@ -6,11 +6,7 @@ import numpy as np
 
 from pandas.api.types import is_numeric_dtype
 
-from scipy.stats import iqr, zscore
-from sklearn.preprocessing import maxabs_scale
-from sklearn.preprocessing import minmax_scale
-from sklearn.preprocessing import normalize
-from sklearn.preprocessing import scale
+from src.utils import unfold_dictionary
 
 class Filter_Data:
     keys = ['df', 'query']
@@ -21,9 +17,71 @@ class Filter_Data:
             query: str,
             ) -> pd.core.frame.DataFrame: 
 
-        filtered = df.query(query)
+        return self.filter_view(df, query).materialize()
+
+    def filter_view(
+            self,
+            df: pd.core.frame.DataFrame,
+            query: str,
+            ) -> 'Row_View':
+        """The rows that satisfy `query`, as a `Row_View`; the query is only evaluated when the rows
+        are first needed.
+        """
+
+        return Row_View(df, lambda: np.flatnonzero(df.eval(query).to_numpy(dtype=bool)))
+
+
+class Row_View:
+    """A subset of the rows of a data frame, kept as an array of row positions (or a function that
+    returns them, evaluated on first use). The data frame is shared, not copied, and is only built
+    (`materialize`, with a new 0..n-1 index) when it is needed; selecting columns (`view[column]`,
+    `view[[columns]]`) only copies those columns.
+    """
+
+    def __init__(self, df: pd.core.frame.DataFrame, rows: Union[np.ndarray, Callable]):
+        self.df = df
+        self._rows = rows
+        self.frame = None
+
+    @property
+    def rows(self) -> np.ndarray:
+        if callable(self._rows):
+            self._rows = self._rows()
+
+        return self._rows
+
+    @property
+    def columns(self) -> pd.core.indexes.base.Index:
+        return self.df.columns
+
+    @property
+    def shape(self) -> tuple:
+        return (len(self.rows), self.df.shape[1])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, key) -> Union[pd.core.series.Series, pd.core.frame.DataFrame]:
+        if self.frame is not None:
+            return self.frame[key]
+
+        return self.df[key].iloc[self.rows].reset_index(drop=True)
+
+    def materialize(self) -> pd.core.frame.DataFrame:
+        if self.frame is None:
+            self.frame = self.df.iloc[self.rows].reset_index(drop=True)
+
+        return self.frame
+
+
+def materialize(df: Union[pd.core.frame.DataFrame, Row_View]) -> pd.core.frame.DataFrame:
+    """The data frame behind a `Row_View` (data frames are returned as they are)."""
+
+    if isinstance(df, Row_View):
+        return df.materialize()
+
+    return df
 
-        return filtered.reset_index(drop=True)
 
 class Trim_Data:
     keys = ['df', 'variable', 'boundaries', 'value', 'scaling_factor', 'z_score', 'ddof']
@@ -39,22 +97,84 @@ class Trim_Data:
         ddof: int = None,
         ) -> pd.core.frame.DataFrame: 
 
+        trimmer = Trim_Engine({'df': df})
+        trimmed = trimmer.trim('df', variable, boundaries, value, scaling_factor, z_score, ddof)
+
+        return trimmed.materialize()
+
+
+class Trim_Engine:
+    """Trims the data sets (dictionary name: data frame) with boolean masks. The statistics the
+    thresholds need (quartiles for `scaling_factor`, mean and standard deviation for `z_score`) are
+    computed once per data set and variable and shared by all the trims; each trim is returned as a
+    `Row_View` of the rows kept.
+    """
+
+    def __init__(self, data_sets: dict, summaries: Union[Callable, None] = None):
+        self.data_sets = data_sets
+        # Optional function returning the `Summary_Accumulator` of a data set (by name), shared with
+        # the other stages that summarize it.
+        self.summaries = summaries
+        self.statistics: dict = {}
+
+    def summary(self, name: str, variable: str):
+        if self.summaries is None:
+            return None
+        summary = self.summaries(name)
+
+        return summary if variable in summary.columns else None
+
+    def quartiles(self, name: str, variable: str) -> tuple:
+        key = (name, variable, 'quartiles')
+        if key not in self.statistics:
+            summary = self.summary(name, variable)
+            if summary is None:
+                # Same linear interpolation as `describe()` and `scipy.stats.iqr`.
+                q1, q3 = self.data_sets[name][variable].quantile([0.25, 0.75])
+            else:
+                q1, q3 = summary.quantile(variable, [0.25, 0.75])
+            self.statistics[key] = (q1, q3, q3 - q1)
+
+        return self.statistics[key]
+
+    def moments(self, name: str, variable: str, ddof: int) -> tuple:
+        key = (name, variable, 'moments', ddof)
+        if key not in self.statistics:
+            summary = self.summary(name, variable)
+            if summary is None:
+                values = self.data_sets[name][variable].to_numpy(dtype=np.float64)
+                self.statistics[key] = (np.nanmean(values), np.nanstd(values, ddof=ddof))
+            else:
+                i = summary.columns.index(variable)
+                self.statistics[key] = (summary.mean[i], np.sqrt(summary.variance(variable, ddof)))
 
-        if value:
+        return self.statistics[key]
+
+    def thresholds(
+        self,
+        name: str,
+        variable: str,
+        value: Union[int, float, tuple] = None,
+        scaling_factor: Union[int, float, tuple] = None,
+        z_score: Union[str, int, tuple] = None,
+        ddof: int = None,
+        ) -> tuple:
+        """Lower and upper thresholds (z-scores when `z_score` is set)."""
+
+        if value is not None:
             if (scaling_factor is not None) or (z_score is not None) or (ddof is not None):
                 raise Exception(f"To properly set the fixed values threshold(s), `scaling_factor`, `z_score`, `ddof`, must be set to None.")
 
             if isinstance(value, (int, float, complex)):
-                lower_threshold, upper_threshold = (value, value)
+                return (value, value)
                 
             if isinstance(value, tuple):
                 if value[0] > value[1]:
                     raise Exception('The minimum threshold must must be lower than the maximum threshold: `value = (min, max)`.')      
                   
-                lower_threshold, upper_threshold = (value[0], value[1]) 
+                return (value[0], value[1])
         
-        if scaling_factor:
-
+        if scaling_factor is not None:
             if (value is not None) or (z_score is not None) or (ddof is not None):
                 raise Exception(f"To properly set the IQR threshold(s), `value`, `z_score`, `ddof`, must be set to None.")
             
@@ -64,47 +184,74 @@ class Trim_Data:
             if isinstance(scaling_factor, tuple):
                 lower_scaling_factor, upper_scaling_factor = (scaling_factor[0], scaling_factor[1])
 
-            q1 = df[variable].describe()['25%']
-            q3 = df[variable].describe()['75%']
-            iqr_value = iqr(df[variable].values, nan_policy='omit')
-
-            lower_threshold = q1 - lower_scaling_factor * iqr_value
-            upper_threshold = q3 + upper_scaling_factor * iqr_value
+            q1, q3, iqr_value = self.quartiles(name, variable)
 
+            return (q1 - lower_scaling_factor * iqr_value, q3 + upper_scaling_factor * iqr_value)
 
-        if z_score:
-            df = df.copy()
+        if z_score is not None:
             if (value is not None) or (scaling_factor is not None):    
                 raise Exception(f"To properly set the z-score threshold(s), `value`, `scaling_factor`, must be set to None.")
             if ddof is None:
                 ddof = 1
 
-            var_name_z = f'{variable}_z_score'
-            df[var_name_z] = zscore(df[variable].values, ddof=ddof, nan_policy='omit')
-        
-            variable = var_name_z
-
             if isinstance(z_score, (int, float, complex)):
-                lower_threshold, upper_threshold = (z_score, z_score)
+                lower_z, upper_z = (z_score, z_score)
             if isinstance(z_score, tuple):
                 if z_score[0] > z_score[1]:
                     raise Exception('The minimum threshold must must be lower than the maximum threshold.')        
 
-                lower_threshold, upper_threshold = (z_score[0], z_score[1])
-        
+                lower_z, upper_z = (z_score[0], z_score[1])
+
+            return (lower_z, upper_z)
+
+        raise Exception('One of `value`, `scaling_factor` or `z_score` must be set to trim the data.')
+
+    def mask(
+        self,
+        name: str,
+        variable: str,
+        boundaries: str = None,
+        value: Union[int, float, tuple] = None,
+        scaling_factor: Union[int, float, tuple] = None,
+        z_score: Union[str, int, tuple] = None,
+        ddof: int = None,
+        ) -> np.ndarray:
+        """Boolean array of the rows kept (rows with missing values in `variable` are removed)."""
+
+        values = self.data_sets[name][variable].to_numpy()
+        if boundaries is None:
+            return np.ones(len(values), dtype=bool)
+
+        lower_threshold, upper_threshold = self.thresholds(name, variable, value, scaling_factor, z_score, ddof)
+
+        if z_score is not None:
+            mean, std = self.moments(name, variable, 1 if ddof is None else ddof)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values = (values.astype(np.float64) - mean) / std
+
         if boundaries == 'lower':
-            df = df.query(f'{lower_threshold} <= {variable}')
+            return lower_threshold <= values
         if boundaries == 'upper':
-            df = df.query(f'{variable} <= {upper_threshold}')
+            return values <= upper_threshold
         if boundaries == 'both':
-            df = df.query(f'{lower_threshold} <= {variable} <= {upper_threshold}')
-        
-        if z_score:
-            df = df.drop(columns=[var_name_z])
+            return (lower_threshold <= values) & (values <= upper_threshold)
+
+        raise Exception("`boundaries` only takes one of the following strings: 'lower', 'upper' and 'both'.")
+
+    def trim(
+        self,
+        name: str,
+        variable: str,
+        boundaries: str = None,
+        value: Union[int, float, tuple] = None,
+        scaling_factor: Union[int, float, tuple] = None,
+        z_score: Union[str, int, tuple] = None,
+        ddof: int = None,
+        ) -> Row_View:
 
-        df = df.reset_index(drop=True)
+        mask = self.mask(name, variable, boundaries, value, scaling_factor, z_score, ddof)
 
-        return df.reset_index(drop=True)
+        return Row_View(self.data_sets[name], np.flatnonzero(mask))
 
 
 def binary_to_dummy(
@@ -113,16 +260,8 @@ def binary_to_dummy(
     invert: bool,
     drop_current: bool
     ) -> pd.core.frame.DataFrame:
-    
-    encoding = [0, 1]
-    if invert:
-        encoding = [1, 0] 
-
-    first_value = df[variable].unique()[0]
 
-    df[f'{variable}_{"d"}'] = df[variable].apply(
-        lambda x: encoding[0] if x==first_value else encoding[1]
-        )
+    df[f'{variable}_{"d"}'] = binary_dummy(df[variable], invert)
     
     if drop_current:
         df = df.drop(columns=variable)
@@ -130,8 +269,48 @@ def binary_to_dummy(
     return df
 
 
+def binary_dummy(series: pd.core.series.Series, invert: bool) -> np.ndarray:
+    """The first value found in the series is encoded as 0 (1 if `invert`) and every other value as 1 (0)."""
+
+    # Codes follow the order of appearance, so code 0 is the first value; missing values get -1.
+    codes, _ = pd.factorize(series, sort=False)
+    if invert:
+        return (codes == 0).astype(np.uint8)
+
+    return (codes != 0).astype(np.uint8)
+
+
+def dummy_block(
+        series: pd.core.series.Series,
+        sparse: bool = False,
+        ) -> pd.core.frame.DataFrame:
+    """Same columns as `pd.get_dummies(series)`, one uint8 column per category (sorted), built from the
+    integer codes of the series in a single pass. With `sparse` the block is stored as sparse columns.
+    """
+
+    codes, categories = pd.factorize(series, sort=True)
+    present = codes >= 0
+    rows = np.flatnonzero(present)
+
+    if sparse:
+        from scipy.sparse import csc_matrix
+
+        matrix = csc_matrix(
+            (np.ones(len(rows), dtype=np.uint8), (rows, codes[present])),
+            shape=(len(codes), len(categories)),
+            )
+        block = pd.DataFrame.sparse.from_spmatrix(matrix, index=series.index, columns=list(categories))
+    else:
+        # Built category by row, the layout pandas stores blocks in, so the transpose is not copied.
+        values = np.zeros((len(categories), len(codes)), dtype=np.uint8)
+        values[codes[present], rows] = 1
+        block = pd.DataFrame(values.T, index=series.index, columns=list(categories))
+
+    return block
+
+
 class Nonbinary_To_Dummies:
-    keys = ['variable', 'add_suffix', 'drop_dummy', 'dummies_names', 'drop_current']
+    keys = ['variable', 'add_suffix', 'drop_dummy', 'dummies_names', 'drop_current', 'sparse']
 
     def nonbinary_to_dummies(
         variable: str,
@@ -140,17 +319,36 @@ class Nonbinary_To_Dummies:
         add_suffix: Union[str, None],
         dummies_names: Union[list, None],
         drop_current: bool,
+        sparse: bool = False,
         ) -> pd.core.frame.DataFrame:
 
+        dummies = Nonbinary_To_Dummies.dummies(df[variable], drop_dummy, add_suffix, dummies_names, sparse)
         
-        dummies = pd.get_dummies(
-            data=df[variable],
-            columns=[variable]
+        df = pd.concat(
+            [
+                df,
+                dummies,
+            ],
+            axis=1
         )
 
+        if drop_current:
+            df = df.drop(columns=[variable])
+
+        return df
+
+    def dummies(
+        series: pd.core.series.Series,
+        drop_dummy: Union[int, str, None],
+        add_suffix: Union[str, None],
+        dummies_names: Union[list, None],
+        sparse: bool = False,
+        ) -> pd.core.frame.DataFrame:
+
+        dummies = dummy_block(series, sparse)
+        
         if add_suffix:
-            for col in dummies.columns:
-                dummies = dummies.rename(columns={col: f'{col}_{add_suffix}'})
+            dummies.columns = [f'{col}_{add_suffix}' for col in dummies.columns]
 
         if drop_dummy:
             if isinstance(drop_dummy, int):
@@ -161,23 +359,11 @@ class Nonbinary_To_Dummies:
         if dummies_names:
             nr_dummies = dummies.shape[1]
             if len(dummies_names) == nr_dummies:
-                for i, col in enumerate(dummies.columns):
-                    dummies = dummies.rename(columns={col: dummies_names[i]})
+                dummies.columns = list(dummies_names)
             else:
                 raise Exception(f'There values in `dummies_names` must correspond to the number of dummies created: {nr_dummies}.')
-        
-        df = pd.concat(
-            [
-                df,
-                dummies,
-            ],
-            axis=1
-        )
-
-        if drop_current:
-            df = df.drop(columns=[variable])
 
-        return df
+        return dummies
 
 
 def categorize_variable(
@@ -200,15 +386,154 @@ def log_variable(
         drop_current: bool
         ) -> pd.core.frame.DataFrame:
     
-    df[f'log_{variable}'] = np.log(df[variable])
+    df[f'log_{variable}'] = log_values(df[variable])
 
     if drop_current:
         df = df.drop(columns=[variable])
 
     return df
 
+
+def log_values(series: pd.core.series.Series) -> pd.core.series.Series:
+    # Downcast integers (int8/int16) would otherwise produce float16 logs.
+    log_dtype = np.result_type(series.dtype, np.float32)
+
+    return np.log(series.astype(log_dtype))
+
+
+class Encoding_Engine:
+    """Applies the binary, non-binary (dummies), log and categorical conversions of the control script
+    to a data frame, in that order. The new columns are computed from integer category codes and kept
+    aside in blocks (all the dummies of a variable form one uint8 block); the data frame is assembled
+    once at the end, instead of being copied at every conversion. The resulting columns and their order
+    are the same as applying the conversions one at a time.
+    """
+
+    def __init__(self, df: pd.core.frame.DataFrame):
+        self.df = df
+        self.blocks: list = []
+        self.location: dict = {}
+        self.dropped: set = set()
+
+    def source(self, variable: str) -> pd.core.series.Series:
+        if variable in self.location:
+            return self.blocks[self.location[variable]][variable]
+        if (variable in self.dropped) or (variable not in self.df.columns):
+            raise Exception(f"'{variable}' could not be found in the data frame.")
+
+        return self.df[variable]
+
+    def add(self, block: pd.core.frame.DataFrame) -> None:
+        for col in block.columns:
+            self.drop(col)
+            self.dropped.discard(col)
+            self.location[col] = len(self.blocks)
+        self.blocks.append(block)
+
+        return
+
+    def drop(self, variable: str) -> None:
+        if variable in self.location:
+            i = self.location.pop(variable)
+            self.blocks[i] = self.blocks[i].drop(columns=[variable])
+        else:
+            self.dropped.add(variable)
+
+        return
+
+    def binary(self, variable: str, invert: bool, drop_current: bool) -> None:
+        series = self.source(variable)
+        self.add(pd.DataFrame({f'{variable}_d': binary_dummy(series, invert)}, index=self.df.index))
+        if drop_current:
+            self.drop(variable)
+
+        return
+
+    def nonbinary(
+            self,
+            variable: str,
+            drop_dummy: Union[int, str, None],
+            add_suffix: Union[str, None],
+            dummies_names: Union[list, None],
+            drop_current: bool,
+            sparse: bool = False,
+            ) -> None:
+
+        self.add(Nonbinary_To_Dummies.dummies(
+            self.source(variable), drop_dummy, add_suffix, dummies_names, sparse,
+            ))
+        if drop_current:
+            self.drop(variable)
+
+        return
+
+    def log(self, variable: str, drop_current: bool) -> None:
+        self.add(log_values(self.source(variable)).to_frame(f'log_{variable}'))
+        if drop_current:
+            self.drop(variable)
+
+        return
+
+    def categorical(self, variable: str, drop_current: bool) -> None:
+        self.add(pd.DataFrame({f'{variable}_cat': pd.Categorical(self.source(variable))}, index=self.df.index))
+        if drop_current:
+            self.drop(variable)
+
+        return
+
+    def apply(self) -> pd.core.frame.DataFrame:
+        if not self.location and not self.dropped:
+            return self.df
+
+        df = self.df.drop(columns=[col for col in self.df.columns if col in self.dropped])
+
+        # Existing columns overwritten by a conversion keep their position, as with `df[name] = ...`.
+        overwritten = [col for col in self.location if col in df.columns]
+        for col in overwritten:
+            df[col] = self.source(col)
+            self.drop(col)
+
+        blocks = [block for block in self.blocks if block.shape[1] > 0]
+
+        return pd.concat([df, *blocks], axis=1, copy=False)
+
+
+def attach_after(
+        df: pd.core.frame.DataFrame,
+        blocks: dict,
+        names: dict,
+        to_drop: list,
+        ) -> pd.core.frame.DataFrame:
+    """Attaches the float blocks computed for each variable (`blocks[variable]`, arrays of shape
+    (columns, rows) named by `names[variable]`) right after the variable, with a single concatenation.
+    """
+
+    # Columns computed again replace the previous ones.
+    existing = [name for var in names for name in names[var] if name in df.columns]
+    if existing:
+        df = df.drop(columns=existing)
+
+    pieces = []
+    start = 0
+    for position in sorted(list(df.columns).index(var) + 1 for var in blocks):
+        var = df.columns[position - 1]
+        block = np.vstack(blocks[var]) if len(blocks[var]) > 1 else blocks[var][0]
+        pieces.append(df.iloc[:, start:position])
+        pieces.append(pd.DataFrame(block.T, index=df.index, columns=names[var]))
+        start = position
+    pieces.append(df.iloc[:, start:])
+
+    df = pd.concat(pieces, axis=1, copy=False)
+
+    if to_drop:
+        df = df.drop(columns=list(dict.fromkeys(to_drop)))
+
+    return df
+
+
 class Percentage_Change:
-    keys = ['variable', 'rows', 'replace_na', 'drop_current', 'differences_only']
+    keys = ['variable', 'rows', 'replace_na', 'drop_current', 'differences_only', 'transform']
+    transformations = {'pct_change': 'pct', 'difference': 'diff', 'lag': 'lag'}
 
     def percentage_change(
             var: str,
@@ -218,37 +543,107 @@ class Percentage_Change:
             drop_current: bool = False,
             differences_only: bool = False,
             ):
-        
-        if rows is None:
-            rows = 1
-        
-        if differences_only:
-            new_var_name = f'{var}_diff_{rows}'
-        else:
-            new_var_name = f'{var}_pct_{rows}'
-
-        if new_var_name in df.columns:
-            df = df.drop(columns=new_var_name)
 
-        df.insert(
-            loc=list(df.columns).index(var)+1,
-            column=new_var_name,
-            value=df[var].pct_change(rows),
-        )
+        return Percentage_Change.percentage_changes(df, [{
+            'variable': var,
+            'rows': rows,
+            'replace_na': replace_na,
+            'drop_current': drop_current,
+            'differences_only': differences_only,
+            }])
 
-        if replace_na is None:
-            df[new_var_name] = df[new_var_name].fillna(0)
+    def percentage_changes(
+            df: pd.core.frame.DataFrame,
+            changes: 'list[dict]',
+            ) -> pd.core.frame.DataFrame:
+        """Builds every percentage change, difference and lag in `changes` (dictionaries with the keys
+        of `percentage_change`, where `variable`, `rows` and `transform` may be lists). The features of
+        a variable are written into one preallocated float block, with missing values replaced as they
+        are computed, and all the blocks are attached to the data frame at once, each after its variable.
+        """
+
+        blocks: dict = {}
+        names: dict = {}
+        to_drop = []
+
+        for dic in changes:
+            full_dic = unfold_dictionary(dic, Percentage_Change.keys)
+            variables = full_dic['variable'] if isinstance(full_dic['variable'], (list, tuple)) else [full_dic['variable']]
+            rows = full_dic['rows'] if isinstance(full_dic['rows'], (list, tuple)) else [full_dic['rows']]
+            rows = [1 if lag is None else lag for lag in rows]
+            replace_na = 0 if full_dic['replace_na'] is None else full_dic['replace_na']
+
+            transforms = full_dic['transform']
+            if transforms is None:
+                transforms = 'difference' if full_dic['differences_only'] else 'pct_change'
+            if not isinstance(transforms, (list, tuple)):
+                transforms = [transforms]
+            for transform in transforms:
+                if transform not in Percentage_Change.transformations:
+                    raise Exception(f"`transform` only takes the following strings: {', '.join(Percentage_Change.transformations)}.")
+
+            for var in variables:
+                if var not in df.columns:
+                    raise Exception(f"'{var}' could not be found in the data frame.")
+
+                values = df[var].to_numpy(dtype=np.float64)
+                # `Series.pct_change` carries the last valid value forward over missing values.
+                padded = df[var].ffill().to_numpy(dtype=np.float64) if 'pct_change' in transforms else None
+
+                block = np.empty((len(transforms) * len(rows), len(values)), dtype=np.float64)
+                i = 0
+                for transform in transforms:
+                    for lag in rows:
+                        source = padded if transform == 'pct_change' else values
+                        Percentage_Change.shifted_change(source, lag, transform, replace_na, out=block[i])
+                        names.setdefault(var, []).append(f'{var}_{Percentage_Change.transformations[transform]}_{lag}')
+                        i += 1
+                blocks.setdefault(var, []).append(block)
+
+                if full_dic['drop_current']:
+                    to_drop.append(var)
+
+        return attach_after(df, blocks, names, to_drop)
+
+    def shifted_change(
+            x: np.ndarray,
+            lag: int,
+            transform: str,
+            replace_na,
+            out: np.ndarray,
+            ) -> np.ndarray:
+        """`x` compared with `x` shifted by `lag` rows (negative lags look ahead), written into `out`."""
+
+        n = len(x)
+        if (lag == 0) or (abs(lag) >= n):
+            out[:] = replace_na if lag else (0.0 if transform != 'lag' else x)
+            return out
+
+        if lag > 0:
+            current, previous, target, edge = x[lag:], x[:-lag], out[lag:], out[:lag]
         else:
-            df[new_var_name] = df[new_var_name].fillna(replace_na)
+            current, previous, target, edge = x[:lag], x[-lag:], out[:lag], out[lag:]
+
+        edge[:] = replace_na
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if transform == 'pct_change':
+                np.divide(current, previous, out=target)
+                target -= 1
+            elif transform == 'difference':
+                np.subtract(current, previous, out=target)
+            else:
+                target[:] = previous
 
-        if drop_current:
-            df = df.drop(columns=var)
+        missing = np.isnan(target)
+        if missing.any():
+            target[missing] = replace_na
 
-        return df
+        return out
 
 
 class Rolling_Window:
     keys = ['variable', 'rows', 'transform', 'one_ahead', 'replace_na', 'ddof', 'drop_current']
+    transformations = ['mean', 'sum', 'minimum', 'maximum', 'variance', 'standard_deviation',]
 
     def rolling_window(
         var: str,
@@ -261,52 +656,387 @@ class Rolling_Window:
         drop_current: bool = False,
         ):
 
-        transformations = ['mean', 'sum', 'minimum', 'maximum', 'variance', 'standard_deviation',]
+        return Rolling_Window.rolling_features(df, [{
+            'variable': var,
+            'rows': rows,
+            'transform': transform,
+            'one_ahead': one_ahead,
+            'replace_na': replace_na,
+            'ddof': ddof,
+            'drop_current': drop_current,
+            }])
+
+    def rolling_features(
+        df: pd.core.frame.DataFrame,
+        windows: 'list[dict]',
+        ) -> pd.core.frame.DataFrame:
+        """Computes every rolling window in `windows` (dictionaries with the keys of `rolling_window`,
+        where `rows`, `transform` and `one_ahead` may also be lists, producing one column per
+        combination). The windows of a variable are computed from one set of cumulative sums (mean, sum,
+        variance, standard deviation) and block-wise running extremes (minimum, maximum), written into a
+        preallocated float block, and all the blocks are attached to the data frame at once, each
+        after its variable.
+        """
+
+        blocks: dict = {}
+        names: dict = {}
+        to_drop = []
+
+        for dic in windows:
+            full_dic = unfold_dictionary(dic, Rolling_Window.keys)
+            var = full_dic['variable']
+            if var not in df.columns:
+                raise Exception(f"'{var}' could not be found in the data frame.")
+
+            combinations = Rolling_Window.combinations(full_dic)
+            if var not in blocks:
+                blocks[var], names[var] = [], []
+
+            x = df[var].to_numpy(dtype=np.float64)
+            windowed = Rolling_Statistics(x)
+            replace_na = 0 if full_dic['replace_na'] is None else full_dic['replace_na']
+            block = np.empty((len(combinations), len(x)), dtype=np.float64)
+            # The same window shifted one row ahead is only computed once.
+            computed = {}
+            for i, (name, rows, transform, one_ahead, ddof) in enumerate(combinations):
+                key = (rows, transform, ddof)
+                if one_ahead:
+                    if key not in computed:
+                        computed[key] = windowed.compute(rows, transform, ddof, out=np.empty(len(x)))
+                    block[i, 1:] = computed[key][:-1]
+                    block[i, :1] = np.nan
+                elif key in computed:
+                    block[i] = computed[key]
+                else:
+                    computed[key] = windowed.compute(rows, transform, ddof, out=block[i])
+                block[i, np.isnan(block[i])] = replace_na
+                names[var].append(name)
+            blocks[var].append(block)
 
-        if (transform in ['variance', 'standard_deviation']) and (ddof is None):
-            ddof = 0
-        if (transform not in ['variance', 'standard_deviation']) and (ddof):
-            raise Exception("Degrees of freedom have been specified but `transform` has not.")
-        
-        new_var_name = f'{var}_roll_{rows}' 
+            if full_dic['drop_current']:
+                to_drop.append(var)
 
-        if transform is None:
-            rolled = df[var].rolling(window=rows).mean()
-        else:
-            if transform in transformations:
-                if transform == 'mean':
-                    rolled = df[var].rolling(window=rows).mean()
-                if transform == 'sum':
-                    rolled = df[var].rolling(window=rows).sum()
-                if transform == 'minimum':
-                    rolled = df[var].rolling(window=rows).min()
-                if transform == 'maximum':
-                    rolled = df[var].rolling(window=rows).max()    
-                if transform == 'variance':
-                    rolled = df[var].rolling(window=rows).var(ddof)
-                if transform == 'standard_deviation':
-                    rolled = df[var].rolling(window=rows).std(ddof)
-            else:
-                raise Exception("`transform` only takes one of the following strings: 'mean', 'sum', 'minimum', 'maximum', 'variance' and 'standard_deviation'.")
+        return attach_after(df, blocks, names, to_drop)
 
-        df.insert(
-            loc=list(df.columns).index(var)+1,
-            column=new_var_name,
-            value=rolled,
-        )
-        
-        if one_ahead:
-            df[new_var_name] = df[new_var_name].shift(1)
+    def combinations(full_dic: dict) -> list:
+        """(name, rows, transform, one_ahead, ddof) for every window requested in a dictionary."""
 
-        if replace_na is None:
-            df[new_var_name] = df[new_var_name].fillna(0)
-        else:
-            df[new_var_name] = df[new_var_name].fillna(replace_na)
+        var = full_dic['variable']
+        rows = full_dic['rows'] if isinstance(full_dic['rows'], (list, tuple)) else [full_dic['rows']]
+        transforms = full_dic['transform'] if isinstance(full_dic['transform'], (list, tuple)) else [full_dic['transform']]
+        one_ahead = full_dic['one_ahead'] if isinstance(full_dic['one_ahead'], (list, tuple)) else [full_dic['one_ahead']]
+        ddof = full_dic['ddof']
 
-        if drop_current:
-            df = df.drop(columns=var)
+        for transform in transforms:
+            if (transform is not None) and (transform not in Rolling_Window.transformations):
+                raise Exception("`transform` only takes one of the following strings: 'mean', 'sum', 'minimum', 'maximum', 'variance' and 'standard_deviation'.")
+        if ddof and not any(transform in ['variance', 'standard_deviation'] for transform in transforms):
+            raise Exception("Degrees of freedom have been specified but `transform` has not.")
 
-        return df
+        combinations = []
+        for window in rows:
+            for transform in transforms:
+                for ahead in one_ahead:
+                    # A single window keeps the name `{variable}_roll_{rows}`.
+                    name = f'{var}_roll_{window}'
+                    if len(transforms) > 1:
+                        name = f'{name}_{transform or "mean"}'
+                    if (len(one_ahead) > 1) and ahead:
+                        name = f'{name}_ahead'
+                    combinations.append((name, window, transform or 'mean', bool(ahead), ddof or 0))
+
+        return combinations
+
+
+class Rolling_Statistics:
+    """Rolling statistics of one column over windows of any length, with the results of
+    `Series.rolling(window).<statistic>()` (a window with missing values gives NaN). Cumulative sums of
+    the values (centered on their mean, to limit cancellation) are computed once and shared by the
+    means and sums of all the windows; variances are combined from the moments of two pieces of each
+    window (see `sum_of_squares`), so their precision does not depend on the length or the drift of
+    the series.
+    """
+
+    def __init__(self, x: np.ndarray):
+        self.x = x
+        self.n = len(x)
+        missing = np.isnan(x)
+        self.center = x[~missing].mean() if (~missing).any() else 0.0
+        centered = np.where(missing, 0.0, x - self.center)
+
+        self.sums = np.concatenate([[0.0], np.cumsum(centered)])
+        self.missing = np.concatenate([[0], np.cumsum(missing)])
+
+    def compute(self, rows: int, transform: str, ddof: int, out: np.ndarray) -> np.ndarray:
+        if (not 0 < rows <= self.n) or (transform in ['variance', 'standard_deviation'] and rows - ddof <= 0):
+            out[:] = np.nan
+            return out
+
+        # Windows end at rows-1, ..., n-1.
+        out[:rows - 1] = np.nan
+        values = out[rows - 1:]
+
+        if transform in ['mean', 'sum']:
+            np.subtract(self.sums[rows:], self.sums[:-rows], out=values)
+            if transform == 'mean':
+                values /= rows
+                values += self.center
+            else:
+                values += rows * self.center
+        elif transform in ['variance', 'standard_deviation']:
+            values[:] = self.sum_of_squares(rows)
+            np.maximum(values, 0.0, out=values)
+            values /= rows - ddof
+            # Windows of a repeated value are exactly 0, as in pandas, instead of a rounding residual.
+            values[self.run_lengths()[rows - 1:] >= rows] = 0.0
+            if transform == 'standard_deviation':
+                np.sqrt(values, out=values)
+        elif transform == 'minimum':
+            values[:] = self.extremes(rows, np.minimum)
+        elif transform == 'maximum':
+            values[:] = self.extremes(rows, np.maximum)
+
+        if self.missing[-1] > 0:
+            values[(self.missing[rows:] - self.missing[:-rows]) > 0] = np.nan
+
+        return out
+
+    def run_lengths(self) -> np.ndarray:
+        """Number of consecutive equal values ending at each row."""
+
+        if not hasattr(self, 'runs'):
+            positions = np.arange(self.n)
+            changes = np.ones(self.n, dtype=bool)
+            changes[1:] = self.x[1:] != self.x[:-1]
+            self.runs = positions - np.maximum.accumulate(np.where(changes, positions, 0)) + 1
+
+        return self.runs
+
+    def sum_of_squares(self, rows: int) -> np.ndarray:
+        """Sum of squared deviations from the mean of every window. As in `extremes`, with blocks of
+        `rows` values every window is the end of one block and the start of the next; the mean and
+        sum of squared deviations of every prefix and suffix of the blocks are accumulated with
+        Welford's updates (one step per position, over all the blocks at once) and the two pieces
+        of each window are combined with Chan's formula. Missing values propagate to the windows
+        that contain them.
+        """
+
+        blocks = -(-self.n // rows)
+        padded = np.full(blocks * rows, np.nan)
+        padded[:self.n] = self.x
+        padded = padded.reshape(blocks, rows).T
+
+        def accumulate(columns: np.ndarray) -> tuple:
+            means = np.empty_like(columns)
+            squares = np.empty_like(columns)
+            means[0], squares[0] = columns[0], 0.0
+            delta = np.empty(columns.shape[1])
+            for k in range(1, columns.shape[0]):
+                np.subtract(columns[k], means[k - 1], out=delta)
+                np.add(means[k - 1], delta / (k + 1), out=means[k])
+                np.subtract(columns[k], means[k], out=squares[k])
+                squares[k] *= delta
+                squares[k] += squares[k - 1]
+            return (means.T.ravel(), squares.T.ravel())
+
+        prefix_mean, prefix_m2 = accumulate(padded)
+        suffix_mean, suffix_m2 = (values.reshape(blocks, rows)[:, ::-1].ravel() for values in accumulate(padded[::-1]))
+
+        # Window starting at s: suffix of its block from s (la values) and prefix of the next block up
+        # to s + rows - 1 (lb = rows - la values, none when s starts a block).
+        windows = self.n - rows + 1
+        lb = np.arange(windows) % rows
+        m2 = suffix_m2[:windows] + np.where(lb > 0, prefix_m2[rows - 1:self.n], 0.0)
+        m2 += (prefix_mean[rows - 1:self.n] - suffix_mean[:windows])**2 * ((rows - lb) * lb / rows)
+
+        return m2
+
+    def extremes(self, rows: int, function: np.ufunc) -> np.ndarray:
+        """Running minimum/maximum (van Herk/Gil-Werman): with blocks of `rows` values, every window
+        spans the end of one block and the start of the next, so it is the extreme of a suffix and a
+        prefix, both computed with one cumulative pass.
+        """
+
+        if rows <= 8:
+            # Short windows: one vectorized pass per position in the window.
+            values = self.x[:self.n - rows + 1].copy()
+            for k in range(1, rows):
+                function(values, self.x[k:k + self.n - rows + 1], out=values)
+            return values
+
+        blocks = -(-self.n // rows)
+        padded = np.full(blocks * rows, np.nan)
+        padded[:self.n] = self.x
+        # One block per column, so each accumulation step runs over all the blocks at once.
+        padded = padded.reshape(blocks, rows).T
+
+        prefix = function.accumulate(padded, axis=0).T.ravel()
+        suffix = function.accumulate(padded[::-1], axis=0)[::-1].T.ravel()
+
+        return function(suffix[:self.n - rows + 1], prefix[rows - 1:self.n])
+
+
+class Polynomial_Features:
+    keys = ['variables', 'degree', 'interaction_only', 'target', 'min_correlation', 'top_k', 'memory_mb', 'sparse', 'dtype']
+
+    def polynomial_features(
+        df: pd.core.frame.DataFrame,
+        variables: Union['list[str]', None] = None,
+        degree: Union[int, None] = None,
+        interaction_only: bool = False,
+        target: Union[str, None] = None,
+        min_correlation: Union[float, None] = None,
+        top_k: Union[int, None] = None,
+        memory_mb: Union[int, float, None] = None,
+        sparse: bool = False,
+        dtype: Union[str, type, None] = None,
+        ) -> pd.core.frame.DataFrame:
+        """Appends the powers and interactions (products) of `variables` up to `degree` (2 by default),
+        as `dtype` columns (float64 by default). `memory_mb` (256 MB by default) bounds the memory of the terms: the screening works on blocks
+        of at most that size and an exception is raised when the dense terms to append would need
+        more (joining them to `df` temporarily takes about as much again). With a `target`, the terms
+        can be screened by the absolute value of their correlation with it (`min_correlation` and/or
+        the `top_k` strongest) in a first pass that keeps no term, so only the selected ones are built. Powers of binary variables are skipped (they equal the variable),
+        and with `sparse` the products of binary variables are stored as sparse columns.
+        """
+
+        if degree is None:
+            degree = 2
+        if memory_mb is None:
+            memory_mb = 256
+        dtype = np.dtype(np.float64 if dtype is None else dtype)
+        if variables is None:
+            variables = [col for col in df.columns if is_numeric_dtype(df[col]) and (col != target)]
+        if ((min_correlation is not None) or (top_k is not None)) and (target is None):
+            raise Exception('Screening the terms by `min_correlation` or `top_k` requires a `target`.')
+        if degree < 2:
+            raise Exception('`degree` must be at least 2.')
+
+        binary = set(binary_columns(df, variables))
+        terms = polynomial_terms(variables, degree, interaction_only, binary)
+        if not terms:
+            return df
+
+        # One contiguous row per variable.
+        base = np.empty((len(variables), df.shape[0]))
+        for i, col in enumerate(variables):
+            base[i] = df[col].to_numpy(dtype=np.float64)
+        block_terms = max(1, int(memory_mb * 2**20 // (8 * max(base.shape[1], 1))))
+
+        if target is not None and ((min_correlation is not None) or (top_k is not None)):
+            y = df[target].to_numpy(dtype=np.float64)
+            correlations = screen_terms(base, y, terms, block_terms)
+            selected = np.ones(len(terms), dtype=bool)
+            if min_correlation is not None:
+                selected &= np.abs(correlations) >= min_correlation
+            if (top_k is not None) and (selected.sum() > top_k):
+                strength = np.where(selected, np.abs(correlations), -np.inf)
+                selected[:] = False
+                selected[np.argsort(-strength, kind='stable')[:top_k]] = True
+            terms = [term for term, keep in zip(terms, selected) if keep]
+
+        dense_terms = [term for term in terms if not (sparse and all(variables[i] in binary for i in term))]
+        sparse_terms = [term for term in terms if term not in dense_terms]
+
+        dense_mb = dtype.itemsize * len(dense_terms) * base.shape[1] / 2**20
+        if dense_mb > memory_mb:
+            raise Exception(
+                f'The {len(dense_terms)} dense terms need {round(dense_mb)} MB, more than `memory_mb` ({memory_mb} MB). '
+                'Screen them with a `target` and `top_k` or `min_correlation`, store the products of binary variables with `sparse`, or raise `memory_mb`.'
+                )
+
+        pieces = [df]
+        if dense_terms:
+            block = np.empty((len(dense_terms), base.shape[1]), dtype=dtype)
+            for t, term in enumerate(dense_terms):
+                term_product(base, term, out=block[t])
+            names = [term_name(variables, term) for term in dense_terms]
+            pieces.append(pd.DataFrame(block.T, index=df.index, columns=names, copy=False))
+
+        if sparse_terms:
+            from scipy.sparse import csc_matrix
+
+            ones = [base[i] == 1 for i in range(len(variables))]
+            rows = [np.flatnonzero(np.logical_and.reduce([ones[i] for i in term])) for term in sparse_terms]
+            matrix = csc_matrix(
+                (np.ones(sum(len(r) for r in rows), dtype=np.uint8), np.concatenate(rows), np.cumsum([0] + [len(r) for r in rows])),
+                shape=(base.shape[1], len(sparse_terms)),
+                )
+            names = [term_name(variables, term) for term in sparse_terms]
+            pieces.append(pd.DataFrame.sparse.from_spmatrix(matrix, index=df.index, columns=names))
+
+        existing = [col for piece in pieces[1:] for col in piece.columns if col in df.columns]
+        if existing:
+            pieces[0] = df.drop(columns=existing)
+
+        return pd.concat(pieces, axis=1, copy=False)
+
+
+def polynomial_terms(
+        variables: 'list[str]',
+        degree: int,
+        interaction_only: bool,
+        binary: set,
+        ) -> 'list[tuple]':
+    """Terms of degree 2 to `degree`, as tuples of variable positions (repeated for powers)."""
+
+    from itertools import combinations, combinations_with_replacement
+
+    generate = combinations if interaction_only else combinations_with_replacement
+    terms = []
+    for d in range(2, degree + 1):
+        for term in generate(range(len(variables)), d):
+            # x^2 = x for 0/1 variables.
+            if any(variables[i] in binary and term.count(i) > 1 for i in set(term)):
+                continue
+            terms.append(term)
+
+    return terms
+
+
+def term_product(base: np.ndarray, term: tuple, out: np.ndarray) -> np.ndarray:
+    np.multiply(base[term[0]], base[term[1]], out=out)
+    for i in term[2:]:
+        out *= base[i]
+
+    return out
+
+
+def term_name(variables: 'list[str]', term: tuple) -> str:
+    """E.g. 'age_x_bmi', 'age_pow_2', 'age_pow_2_x_bmi'."""
+
+    factors = []
+    for i in dict.fromkeys(term):
+        power = term.count(i)
+        factors.append(variables[i] if power == 1 else f'{variables[i]}_pow_{power}')
+
+    return '_x_'.join(factors)
+
+
+def screen_terms(base: np.ndarray, y: np.ndarray, terms: 'list[tuple]', block_terms: int) -> np.ndarray:
+    """Pearson correlation of every term with `y` (rows with missing values are left out), computed
+    `block_terms` terms at a time.
+    """
+
+    complete = ~np.isnan(y) & ~np.isnan(base).any(axis=0)
+    if not complete.all():
+        base, y = base[:, complete], y[complete]
+
+    centered_y = y - y.mean()
+    norm_y = np.sqrt(centered_y @ centered_y)
+
+    correlations = np.empty(len(terms))
+    block = np.empty((min(block_terms, len(terms)), len(y)))
+    for start in range(0, len(terms), block_terms):
+        chunk = terms[start:start + block_terms]
+        values = block[:len(chunk)]
+        for t, term in enumerate(chunk):
+            term_product(base, term, out=values[t])
+        values -= values.mean(axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            correlations[start:start + len(chunk)] = (values @ centered_y) / (np.sqrt(np.einsum('ij,ij->i', values, values)) * norm_y)
+
+    return np.nan_to_num(correlations, nan=0.0)
 
 
 class Replace_Values:
@@ -321,86 +1051,183 @@ class Replace_Values:
         ddof: Union[int, None] = None,
         ) -> pd.core.frame.DataFrame:
 
-        message = None
+        df, messages = Replace_Values.replace_values_batch(
+            df,
+            [{'variable': variable, 'replace': replace, 'value': value, 'transform': transform, 'ddof': ddof}],
+            )
+
+        return (df, messages[0],)
+
+    def replace_values_batch(
+        df: pd.core.frame.DataFrame,
+        replacements: 'list[dict]',
+        summary: Union[Callable, None] = None,
+        ) -> 'tuple[pd.core.frame.DataFrame, list]':
+        """Applies all the replacements (dictionaries with the keys of `replace_values`), grouped by
+        column and in their original order within each column. Values are matched with vectorized
+        `isin` masks and written in place; the unique values and fill statistics of a column are
+        computed once and only recomputed after the column has been modified. `summary` optionally
+        returns the `Summary_Accumulator` of `df`, used for the statistics of unmodified columns.
+        Returns the data frame and one message (or None) per replacement.
+        """
+
+        messages = [None] * len(replacements)
+        by_column: dict = {}
+        for i, dic in enumerate(replacements):
+            full_dic = unfold_dictionary(dic, Replace_Values.keys)
+            if full_dic['replace'] is None:
+                full_dic['replace'] = 'missing_values'
+            by_column.setdefault(full_dic['variable'], []).append((i, full_dic))
+
+        for variable, entries in by_column.items():
+            statistics = {}
+            uniques = None
+            modified = False
+            for i, full_dic in entries:
+                replace, value, transform = full_dic['replace'], full_dic['value'], full_dic['transform']
+
+                if value and transform:
+                    raise Exception('If `transform` is chosen to replace NAs then `value` must be None, and vice-versa.')
+
+                if transform:
+                    key = (transform, full_dic['ddof'])
+                    if key not in statistics:
+                        statistics[key] = fill_statistic(
+                            df[variable],
+                            variable,
+                            transform,
+                            full_dic['ddof'],
+                            summary() if (summary is not None) and (modified is False) else None,
+                            )
+                    value = statistics[key]
+
+                if isinstance(replace, str) and (replace == 'missing_values'):
+                    mask = df[variable].isna()
+                    if not mask.any():
+                        messages[i] = f'- No replacements were made in {variable} since no missing values were found in it.'
+                        continue
+
+                elif isinstance(replace, (list, tuple, set)):
+                    if uniques is None:
+                        uniques = pd.Index(df[variable].unique())
+                    replace = list(replace)
+                    not_replaced = [replace[j] for j in np.flatnonzero(~pd.Index(replace).isin(uniques))]
+                    if len(not_replaced) == len(replace):
+                        messages[i] = f"- No replacements took place since none of the values in `replace` could be found in {variable}."
+                        continue
+
+                    if 0 < len(not_replaced) < len(replace):
+                        not_replaced = [str(j) for j in not_replaced]
+                        messages[i] = f"- The following values: {', '.join(not_replaced)}, could not be found in {variable}."
+
+                    mask = df[variable].isin(replace)
+
+                elif isinstance(replace, (int, float, complex, str)):
+                    mask = df[variable] == replace
+                    if not mask.any():
+                        messages[i] = f"- No replacement took place since the value in `replace`: {replace}, could not be found in {variable}."
+                        continue
 
-        if value and transform:
-            raise Exception('If `transform` is chosen to replace NAs then `value` must be None, and vice-versa.')
-        
-        transformations = [
-                'minimum',
-                'maximum',
-                'mode',
-                'median',
-                'mean',
-                'variance',
-                'standard_deviation',
-                ]
-            
-        if transform:            
-            if transform not in ['variance', 'standard_deviation']:
-                if ddof:
-                    raise Exception('Degrees of freedom, `ddof`, must only be set when `transform` is set as `variance` or `standard_deviation`.')
-            else:
-                if ddof is None:
-                    ddof = 1
-
-            if transform in transformations:
-                if transform == 'minimum':
-                    value = df[variable].min()
-                if transform == 'maximum':
-                    value = df[variable].min()
-                if transform == 'mode':
-                    value = df[variable].mode()
-                    if len(value) > 1:
-                        raise Exception(f'{variable} has multiple modes:\n{value}.')
-                if transform == 'median':
-                    value = df[variable].median()
-                if transform == 'mean':
-                    value = df[variable].mean()
-                if transform == 'variance':
-                    value =  df[variable].var(ddof=ddof,)
-                if transform == 'standard_deviation':
-                    value =  df[variable].std(ddof=ddof,)
-
-            elif (re.fullmatch('quantile=(0or1).\d+', transform)) or (re.fullmatch('quantile=(0or1)', transform)):
-                q = float(transform[9:])
-                if 0 <= q <= 1:
-                    value = df[variable].quantile(q)
                 else:
-                    raise Exception("Values passed should be floats within [0, 1]")
-            else:
-                raise Exception(f"The '{transform}' could not be found, or calculated, or inserted for '{variable}'.")
+                    continue
 
-        if replace == 'missing_values':
-            count_na = df[variable].isna().sum()
-            if count_na == 0:
-                message = f'- No replacements were made in {variable} since no missing values were found in it.'
-            else:
-                df[variable] = df[variable].fillna(value)
+                write_values(df, variable, mask, value)
+                statistics = {}
+                uniques = None
+                modified = True
 
-        elif isinstance(replace, (list, tuple, set)):
-            not_replaced = [value for value in replace if value not in set(df[variable].unique())]
-            if len(not_replaced) == len(replace):
-                message = f"- No replacements took place since none of the values in `replace` could be found in {variable}."
-            
-            if 0 < len(not_replaced) < len(replace):
-                not_replaced = [str(i) for i in not_replaced]
-                message = f"- The following values: {', '.join(not_replaced)}, could not be found in {variable}."
+        return (df, messages,)
 
-            df[variable] = df[variable].apply(lambda x: value if x in replace else x)
 
-        elif isinstance(replace, (int, float, complex, str)):
-            check_replaced = replace in set(df[variable].unique())
-            if ~check_replaced:
-                message = f"- No replacement took place since the value in `replace`: {replace}, could not be found in {variable}."
-            
-            df[variable] = df[variable].apply(lambda x: value if x == replace else x)
-        
-        return (df, message,)
+def fill_statistic(
+        series: pd.core.series.Series,
+        variable: str,
+        transform: str,
+        ddof: Union[int, None] = None,
+        summary = None,
+        ):
+    """Summary statistic used by `Replace_Values` in place of a fixed `value`. Means, variances,
+    standard deviations and quantiles are read from `summary` (a `Summary_Accumulator` of the data
+    frame) when it holds the variable.
+    """
+
+    transformations = [
+        'minimum',
+        'maximum',
+        'mode',
+        'median',
+        'mean',
+        'variance',
+        'standard_deviation',
+        ]
+
+    if transform not in ['variance', 'standard_deviation']:
+        if ddof:
+            raise Exception('Degrees of freedom, `ddof`, must only be set when `transform` is set as `variance` or `standard_deviation`.')
+    else:
+        if ddof is None:
+            ddof = 1
+
+    if (summary is not None) and (variable not in summary.columns):
+        summary = None
+
+    if transform in transformations:
+        if summary is not None:
+            if transform == 'median':
+                return summary.quantile(variable, 0.5)
+            if transform == 'mean':
+                return summary.mean[summary.columns.index(variable)]
+            if transform == 'variance':
+                return summary.variance(variable, ddof)
+            if transform == 'standard_deviation':
+                return np.sqrt(summary.variance(variable, ddof))
+        if transform == 'minimum':
+            return series.min()
+        if transform == 'maximum':
+            return series.max()
+        if transform == 'mode':
+            value = series.mode()
+            if len(value) > 1:
+                raise Exception(f'{variable} has multiple modes:\n{value}.')
+            return value.iloc[0]
+        if transform == 'median':
+            return series.median()
+        if transform == 'mean':
+            return series.mean()
+        if transform == 'variance':
+            return series.var(ddof=ddof,)
+        if transform == 'standard_deviation':
+            return series.std(ddof=ddof,)
+
+    if re.fullmatch(r'quantile=(0|1)(\.\d+)?', transform):
+        q = float(transform[9:])
+        if 0 <= q <= 1:
+            if summary is not None:
+                return summary.quantile(variable, q)
+            return series.quantile(q)
+        raise Exception("Values passed should be floats within [0, 1]")
+
+    raise Exception(f"The '{transform}' could not be found, or calculated, or inserted for '{variable}'.")
+
+
+def write_values(
+        df: pd.core.frame.DataFrame,
+        variable: str,
+        mask: pd.core.series.Series,
+        value,
+        ) -> None:
+    """Writes `value` in the rows of `mask`, in place when the column's type can hold it."""
+
+    if isinstance(df[variable].dtype, pd.CategoricalDtype) and (value not in df[variable].cat.categories):
+        df[variable] = df[variable].cat.add_categories([value])
+
+    df.loc[mask, variable] = value
+
+    return
 
 
 class Standardize:
-    keys = ['vars', 'transform', 'include_binary', 'round']
+    keys = ['vars', 'transform', 'include_binary', 'round', 'fit_on', 'dtype', 'save_to', 'load_from']
 
     def standardize(
             df: pd.core.frame.DataFrame,
@@ -409,52 +1236,216 @@ class Standardize:
             include_binary: Union[bool, 'list[str]'] = None,
             round: int = None,
             ) -> pd.core.frame.DataFrame:
-        
+
         df = df.copy()
 
-        numerical = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]    
+        scaler = Scaler(transform, Standardize.columns_to_scale(df, vars, include_binary))
+        scaler.fit(df)
+
+        return scaler.transform(df, round=round)
+
+    def columns_to_scale(
+            df: pd.core.frame.DataFrame,
+            vars: 'list[str]' = None,
+            include_binary: Union[bool, 'list[str]'] = None,
+            ) -> 'list[str]':
+        """Numeric columns to standardize; binary (0/1) columns are excluded unless `include_binary`."""
+
+        numerical = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
 
         if vars:
             vars = [col for col in vars if pd.api.types.is_numeric_dtype(df[col])]
 
-        if include_binary:
-            if isinstance(include_binary, bool):
-                if vars: 
-                    to_standardize = vars
-                else:    
-                    to_standardize = numerical
-            if isinstance(include_binary, list):
-                if vars: 
-                    raise Exception('Listing the binary variables to standardize only works when the parameter `vars` is omitted; otherwise, specify in `vars` what binary variables should also be included.')
-
-                else:    
-                    all_binary = [col for col in numerical if list(df[col].unique()) == [0, 1]]
-                    binary_to_exclude = [col for col in all_binary if col not in include_binary]
-                    to_standardize = [col for col in numerical if col not in binary_to_exclude]
-        else:
-            if vars: 
-                to_standardize = [col for col in vars if list(df[col].unique()) != [0, 1]]
-            else:
-                to_standardize = [col for col in numerical if list(df[col].unique()) != [0, 1]]
-
-        std_types = ['max_abs', 'min_max', 'z_score']
-
-        if transform:
-            if transform in std_types: 
-                if transform == 'min_max':
-                    df[to_standardize] = minmax_scale(df[to_standardize])
-                if transform == 'max_absolute':
-                    df[to_standardize] = maxabs_scale(df[to_standardize])
-                if transform == 'z_score':
-                    df[to_standardize] = scale(df[to_standardize])
-            else:
-                raise Exception(f'Only one of the following standardization/re-scaling methods can be used: {", ".join(std_types)}')
+        if isinstance(include_binary, list) and vars:
+            raise Exception('Listing the binary variables to standardize only works when the parameter `vars` is omitted; otherwise, specify in `vars` what binary variables should also be included.')
+
+        candidates = vars if vars else numerical
+        if include_binary is True:
+            return candidates
+
+        all_binary = binary_columns(df, candidates)
+        if isinstance(include_binary, list):
+            return [col for col in candidates if (col not in all_binary) or (col in include_binary)]
+
+        return [col for col in candidates if col not in all_binary]
 
-        else:   
-            df[to_standardize] = minmax_scale(df[to_standardize])
 
-        if round:
-            df[to_standardize] = df[to_standardize].round(round)
+def binary_columns(df: pd.core.frame.DataFrame, columns: 'list[str]') -> 'list[str]':
+    """Columns that only take the values 0 and 1 (both present, no missing values)."""
+
+    if not columns:
+        return []
+
+    # Only the columns with minimum 0 and maximum 1 are checked value by value.
+    numeric = df[columns]
+    candidates = [col for col, low, high in zip(columns, numeric.min(), numeric.max()) if (low == 0) and (high == 1)]
+
+    return [col for col in candidates if df[col].isin([0, 1]).all()]
+
+
+def compact_dtypes(df: pd.core.frame.DataFrame) -> pd.core.frame.DataFrame:
+    """Floats are stored as float32, binary (0/1) integers as uint8 and the other integers in the
+    smallest signed type that holds their values. Booleans, categories and text are left unchanged.
+    """
+
+    integers = [col for col in df.columns if pd.api.types.is_integer_dtype(df[col])]
+    binary = set(binary_columns(df, integers))
+
+    columns = {}
+    for col in df.columns:
+        if col in binary:
+            if df[col].dtype != np.uint8:
+                columns[col] = df[col].astype(np.uint8)
+        elif col in integers:
+            downcast = pd.to_numeric(df[col], downcast='integer')
+            if downcast.dtype != df[col].dtype:
+                columns[col] = downcast
+        elif pd.api.types.is_float_dtype(df[col]) and (df[col].dtype != np.float32):
+            columns[col] = df[col].astype(np.float32)
+
+    if not columns:
+        return df
+
+    df = df.copy(deep=False)
+    for col, values in columns.items():
+        df.isetitem(df.columns.get_loc(col), values)
+
+    return df
+
+
+class Scaler:
+    """Min-max, maximum absolute or z-score scaling with parameters fitted on one data set (e.g. train)
+    and applied to others. The statistics (count, mean, sum of squared deviations, minimum, maximum)
+    are accumulated with `partial_fit`, so the scaler can also be fitted chunk by chunk; the fitted
+    scaler can be saved to and loaded from a JSON file. Missing values are ignored when fitting and
+    kept when transforming; constant columns are only shifted, as in scikit-learn.
+    """
+
+    transformations = ['max_abs', 'min_max', 'z_score']
+
+    def __init__(self, transform: Union[str, None] = None, columns: Union['list[str]', None] = None):
+        if transform is None:
+            transform = 'min_max'
+        if transform == 'max_absolute':
+            transform = 'max_abs'
+        if transform not in Scaler.transformations:
+            raise Exception(f'Only one of the following standardization/re-scaling methods can be used: {", ".join(Scaler.transformations)}')
+
+        self.transform_type = transform
+        self.columns = None if columns is None else list(columns)
+        self.count = None
+        self.mean = None
+        self.m2 = None
+        self.minimum = None
+        self.maximum = None
+
+    def partial_fit(self, df: pd.core.frame.DataFrame) -> 'Scaler':
+        if self.columns is None:
+            self.columns = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
+
+        values = df[self.columns].to_numpy(dtype=np.float64)
+        count = (~np.isnan(values)).sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, np.nansum(values, axis=0) / count, 0.0)
+            m2 = np.nansum((values - mean)**2, axis=0)
+            minimum = np.where(count > 0, np.fmin.reduce(values, axis=0, initial=np.inf), np.nan)
+            maximum = np.where(count > 0, np.fmax.reduce(values, axis=0, initial=-np.inf), np.nan)
+
+        if self.count is None:
+            self.count, self.mean, self.m2, self.minimum, self.maximum = count, mean, m2, minimum, maximum
+            return self
+
+        # Pairwise update of the mean and the sum of squared deviations (Chan et al.).
+        total = self.count + count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = mean - self.mean
+            weight = np.where(total > 0, count / total, 0.0)
+            self.m2 = self.m2 + m2 + delta**2 * self.count * weight
+            self.mean = self.mean + delta * weight
+        self.count = total
+        self.minimum = np.fmin(self.minimum, minimum)
+        self.maximum = np.fmax(self.maximum, maximum)
+
+        return self
+
+    def fit(self, df: pd.core.frame.DataFrame) -> 'Scaler':
+        self.count = None
+
+        return self.partial_fit(df)
+
+    def parameters(self) -> tuple:
+        """Offset and scale of each column: scaled = (x - offset) / scale."""
+
+        if self.count is None:
+            raise Exception('The scaler has not been fitted.')
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if self.transform_type == 'min_max':
+                offset, scale = self.minimum, self.maximum - self.minimum
+            if self.transform_type == 'max_abs':
+                offset, scale = np.zeros(len(self.columns)), np.fmax(np.abs(self.minimum), np.abs(self.maximum))
+            if self.transform_type == 'z_score':
+                offset, scale = self.mean, np.sqrt(self.m2 / self.count)
+
+        scale = np.where((scale == 0) | np.isnan(scale), 1.0, scale)
+
+        return (offset, scale)
+
+    def transform(
+            self,
+            df: pd.core.frame.DataFrame,
+            dtype: Union[str, type] = np.float64,
+            round: Union[int, None] = None,
+            ) -> pd.core.frame.DataFrame:
+        """Scales the fitted columns of `df` (as float32 or float64) and returns it. The scaled columns
+        replace the original ones in `df`; the other columns are not copied, so a shallow copy
+        (`df.copy(deep=False)`) can be passed to keep the original data frame unchanged.
+        """
+
+        if not self.columns:
+            return df
+
+        offset, scale = self.parameters()
+        dtype = np.dtype(dtype)
+
+        # One row per column, so each scaled column is a contiguous array.
+        values = df[self.columns].to_numpy(dtype=dtype).T.copy()
+        values -= offset.astype(dtype)[:, None]
+        values /= scale.astype(dtype)[:, None]
+        if round is not None:
+            np.round(values, round, out=values)
+
+        for position, column_values in zip(df.columns.get_indexer(self.columns), values):
+            df.isetitem(position, column_values)
 
         return df
 
+    def save(self, path: str) -> None:
+        import json
+
+        state = {
+            'transform': self.transform_type,
+            'columns': self.columns,
+            'count': self.count.tolist(),
+            'mean': self.mean.tolist(),
+            'm2': self.m2.tolist(),
+            'minimum': self.minimum.tolist(),
+            'maximum': self.maximum.tolist(),
+            }
+        with open(path, 'w') as file:
+            json.dump(state, file, indent=4)
+
+        return
+
+    def load(path: str) -> 'Scaler':
+        import json
+
+        with open(path) as file:
+            state = json.load(file)
+
+        scaler = Scaler(state['transform'], state['columns'])
+        scaler.count = np.array(state['count'], dtype=np.int64)
+        for name in ['mean', 'm2', 'minimum', 'maximum']:
+            setattr(scaler, name, np.array(state[name], dtype=np.float64))
+
+        return scaler
@@ -6,9 +6,9 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches # for custom legends in the graphs
 import seaborn as sns
-import statsmodels.api as sm
 
 from src.utils import unfold_dictionary
+from src.data_transformation import materialize
 
     
 @dataclass
@@ -126,14 +126,14 @@ class Display_Panels:
             self.container_1_hp = 'processed'
             self.df_1 = self.all_data_sets[self.container_1_hp][self.df_1_hp]
         else:
-            self.df_1 = self.all_data_sets[self.container_1_hp][self.index_1_hp][self.df_1_hp]
+            self.df_1 = materialize(self.all_data_sets[self.container_1_hp][self.index_1_hp][self.df_1_hp])
         
         if self.df_2_hp:
             if self.container_2_hp is None:
                 self.container_2_hp = 'processed'
                 self.df_2 = self.all_data_sets[self.container_2_hp][self.df_2_hp]
             else:
-                self.df_2 = self.all_data_sets[self.container_2_hp][self.index_2_hp][self.df_2_hp]
+                self.df_2 = materialize(self.all_data_sets[self.container_2_hp][self.index_2_hp][self.df_2_hp])
 
             if ('histogram' in self.panel_hp) or (self.panel_hp == 'histogram'):
                 self.df_2_hist = self.df_2
@@ -437,14 +437,20 @@ class Heat_Map:
             else:
                 raise Exception(f"If the data has not been split, only 'main' or 'train' can be passed to `df`.")
 
-    def display_heat_map(self, data_sets: dict,) -> None:
+    def display_heat_map(self, data_sets: dict, covariance=None) -> None:
+        """`covariance` is an optional `Covariance_Accumulator` of the data set, shared with the other
+        stages that need its correlations.
+        """
 
         if self.split:
             df = data_sets[self.df_hp]
         else:
             df = data_sets[self.df_hp]
 
-        corr = df[self.variables_hp].corr(method='pearson', numeric_only=True)
+        if covariance is None:
+            corr = df[self.variables_hp].corr(method='pearson', numeric_only=True)
+        else:
+            corr = covariance.correlation([var for var in self.variables_hp if var in covariance.columns])
 
         length = len(self.variables_hp)
 
@@ -573,6 +579,8 @@ def resid_visual_analysis_1(
 
 def resid_visual_analysis_2(residuals: pd.core.series.Series, target_series: pd.core.series.Series):
 
+    import statsmodels.api as sm
+
     # Plots for normal distribution.
 
     fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(10, 12))
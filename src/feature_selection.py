@@ -12,6 +12,8 @@ from sklearn.feature_selection import chi2, f_classif, f_regression
 class Feat_Selector:
     def __init__(self):
         self.df: pd.core.frame.DataFrame = None
+        self.profile = None # optional `data_checks.Data_Profile` of `df`
+        self.covariance = None # optional `statistical_analysis.Covariance_Accumulator` of `df`
         self.X: list = None 
         self.univariate_container: list = None
         self.recursive_elimination_container: list = None
@@ -43,10 +45,13 @@ class Feat_Selector:
         elif criterion == 'f_classif':
             criterion = f_classif
             # Check whether there are constant vars/columns in the data set. 
-            constant_explanatory_variables = []
-            for col in self.df[self.X].columns:
-                if len(self.df[col].unique()) == 1:
-                    constant_explanatory_variables.append(col)
+            if self.profile is not None:
+                constant_explanatory_variables = self.profile.constant_columns(self.X)
+            else:
+                constant_explanatory_variables = []
+                for col in self.df[self.X].columns:
+                    if len(self.df[col].unique()) == 1:
+                        constant_explanatory_variables.append(col)
             if len(constant_explanatory_variables) > 0:
                 print('Warning - One or more explanatory variables are constant (only have one value). Consider removing them:')
                 print(f"    - {', '.join(constant_explanatory_variables)}")
@@ -57,12 +62,23 @@ class Feat_Selector:
         else:
             raise ValueError('Error: the criterion must be on of following: "f_classif", "f_regression", "chi2".')
 
-        X_selection = (
-            SelectKBest(score_func=criterion, k=k_vars)
-            .fit(self.df[self.X], self.df[target])
+        use_correlations = (
+            (criterion is f_regression)
+            and (self.covariance is not None)
+            and self.covariance.complete()
+            and (target not in self.X)
+            and all(col in self.covariance.columns for col in [*self.X, target])
         )
 
-        X_selection_list = X_selection.get_feature_names_out().tolist()
+        if use_correlations:
+            X_selection_list = self.f_regression_k_best(target, k_vars)
+        else:
+            X_selection = (
+                SelectKBest(score_func=criterion, k=k_vars)
+                .fit(self.df[self.X], self.df[target])
+            )
+
+            X_selection_list = X_selection.get_feature_names_out().tolist()
 
         model_dict = {'target': target, 'x_vars': X_selection_list}
 
@@ -71,6 +87,27 @@ class Feat_Selector:
         return 
 
 
+    def f_regression_k_best(self, target: str, k_vars: Union[int, str]) -> list:
+        """Same selection as `SelectKBest(f_regression, k=k_vars)`, with the F statistics derived from
+        the stored correlations with the target: F = r^2 / (1 - r^2) * (n - 2).
+        """
+
+        if k_vars == 'all':
+            return list(self.X)
+
+        r = self.covariance.correlation([*self.X, target])[target].to_numpy()[:-1]
+        n = self.covariance.count.max()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = r**2 / (1 - r**2) * (n - 2)
+        # As `f_regression(force_finite=True)`: constant features score 0, perfect correlations the maximum.
+        scores = np.where(np.isnan(scores), 0.0, np.where(np.isinf(scores), np.finfo(np.float64).max, scores))
+
+        selected = np.zeros(len(self.X), dtype=bool)
+        selected[np.argsort(scores, kind='mergesort')[-k_vars:]] = True
+
+        return [col for col, keep in zip(self.X, selected) if keep]
+
+
     def recursive_elimination(
         self,
         target: str,
@@ -1,15 +1,16 @@
+from typing import Union
+
 import pandas as pd
 import numpy as np
-import statsmodels.api as sm
 import sys
 
-from sklearn.linear_model import LinearRegression as lr
-from sklearn.metrics import mean_squared_error as mse
-from sklearn.metrics import r2_score as r2
-
 sys.path.append('../src')
-from src import data_visualization as dv
-from src.statistical_tests import *
+from src.utils import lazy_import
+from src import data_splitting as ds
+
+# Plotting and hypothesis tests are only needed for the residuals analysis.
+dv = lazy_import('src.data_visualization')
+st = lazy_import('src.statistical_tests')
 
 # Support function that print regression results contained in a dictionary (the output of `reg_results`).
 def result_printer(results: dict) -> None:
@@ -18,6 +19,343 @@ def result_printer(results: dict) -> None:
             print(f'{key} = {results[key]}')
     return
 
+# Design matrix shared with worker processes (see `map_over_design`).
+shared_design: dict = {}
+
+
+def design_models(X: list, y: list) -> tuple:
+    """Columns used by the models and, for each model, the positions in the design matrix of the
+    constant and the explanatory variables (first) and of the target (second).
+    """
+
+    columns = list(dict.fromkeys(col for feats, target in zip(X, y) for col in [*feats, target]))
+    models = [
+        ([0] + [columns.index(feat) + 1 for feat in feats], columns.index(target) + 1)
+        for feats, target in zip(X, y)
+        ]
+
+    return (columns, models)
+
+
+def build_design(values: np.ndarray, means: np.ndarray, out: Union[np.ndarray, None] = None) -> np.ndarray:
+    """Design matrix: a constant followed by `values` minus `means`."""
+
+    if out is None:
+        out = np.empty((values.shape[0], values.shape[1] + 1))
+    out[:, 0] = 1.0
+    np.subtract(values, means, out=out[:, 1:])
+
+    return out
+
+
+def map_over_design(
+        values: np.ndarray,
+        means: np.ndarray,
+        function,
+        tasks: list,
+        n_jobs: Union[int, None],
+        context: dict,
+        ) -> tuple:
+    """Builds the design matrix - a constant followed by `values` minus `means` - and its Gram matrix,
+    and returns the Gram matrix along with `function(design, gram, context, task)` for every task.
+    Centring does not change the fitted values of models with a constant, but it keeps the Gram
+    matrices well conditioned. With `n_jobs` above 1 the tasks run in worker processes that read the
+    design matrix from shared memory instead of receiving copies.
+    """
+
+    shape = (values.shape[0], values.shape[1] + 1)
+    parallel = (n_jobs is not None) and (n_jobs != 1)
+    if parallel:
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import shared_memory
+        from functools import partial
+
+        memory = shared_memory.SharedMemory(create=True, size=8 * shape[0] * shape[1])
+        design = np.ndarray(shape, dtype=np.float64, buffer=memory.buf)
+    else:
+        design = np.empty(shape)
+
+    try:
+        build_design(values, means, out=design)
+        gram = design.T @ design
+
+        if parallel:
+            with ProcessPoolExecutor(
+                    max_workers=n_jobs if n_jobs > 0 else None,
+                    initializer=attach_shared_design,
+                    initargs=(memory.name, shape, gram, context),
+                    ) as executor:
+                results = list(executor.map(partial(run_shared, function), tasks))
+        else:
+            results = [function(design, gram, context, task) for task in tasks]
+    finally:
+        del design
+        if parallel:
+            memory.close()
+            memory.unlink()
+
+    return (gram, results)
+
+
+def attach_shared_design(name: str, shape: tuple, gram: np.ndarray, context: dict) -> None:
+    from multiprocessing import shared_memory
+
+    # The block belongs to the parent process, which removes it; workers only read from it.
+    memory = shared_memory.SharedMemory(name=name)
+    shared_design.update(
+        memory=memory,
+        design=np.ndarray(shape, dtype=np.float64, buffer=memory.buf),
+        gram=gram,
+        context=context,
+        )
+
+    return
+
+
+def run_shared(function, task):
+    return function(shared_design['design'], shared_design['gram'], shared_design['context'], task)
+
+
+def solve_gram(gram: np.ndarray, feats: list, target: int) -> np.ndarray:
+    """OLS coefficients from a Gram matrix, or from a stack of Gram matrices (one per leading index)."""
+
+    a = gram[..., feats, :][..., :, feats]
+    b = gram[..., feats, target][..., None]
+    try:
+        beta = np.linalg.solve(a, b)
+    except np.linalg.LinAlgError:
+        beta = np.linalg.pinv(a) @ b
+
+    return beta[..., 0]
+
+
+def gram_sse(gram: np.ndarray, feats: list, target: int, beta: np.ndarray) -> np.ndarray:
+    """Sum of squared errors of the coefficients `beta` on the rows summarized by `gram`."""
+
+    a = gram[np.ix_(feats, feats)]
+    sse = gram[target, target] - 2 * beta @ gram[feats, target] + np.einsum('...i,ij,...j->...', beta, a, beta)
+
+    return np.maximum(sse, 0.0)
+
+
+def fold_errors(design: np.ndarray, gram: np.ndarray, context: dict, test: np.ndarray) -> np.ndarray:
+    """Test mean squared error of each model for one fold. The train Gram matrix of the fold is the
+    full one minus the Gram matrix of the test rows, so each model only needs a small solve.
+    """
+
+    rows = design[test]
+    test_gram = rows.T @ rows
+    train_gram = gram - test_gram
+
+    return np.array([
+        gram_sse(test_gram, feats, target, solve_gram(train_gram, feats, target)) / len(test)
+        for feats, target in context['models']
+        ])
+
+
+def bootstrap_batch(design: np.ndarray, gram: np.ndarray, context: dict, task: tuple) -> list:
+    """Coefficients and validation MSE of each model for one batch of bootstrap replicates. The Gram
+    matrices of all replicates are obtained together: the products of every pair of design columns
+    are formed for a block of rows and multiplied by the replicate counts of those rows, so the data
+    is traversed once per batch and the memory used is bounded by the block size.
+    """
+
+    seed, size = task
+    n, k = design.shape
+    counts = ds.Bootstrap.counts(n, seed, size)
+
+    left, right = np.triu_indices(k)
+    flat = np.zeros((size, len(left)))
+    step = max(1, 4_000_000 // len(left))
+    for start in range(0, n, step):
+        block = design[start:start + step]
+        flat += counts[:, start:start + step] @ (block[:, left] * block[:, right])
+
+    grams = np.empty((size, k, k))
+    grams[:, left, right] = flat
+    grams[:, right, left] = flat
+
+    results = []
+    for feats, target in context['models']:
+        beta = solve_gram(grams, feats, target)
+        mse = gram_sse(context['validation_gram'], feats, target, beta) / context['validation_rows']
+        results.append((beta, mse))
+
+    return results
+
+
+def walk_forward_errors(design: np.ndarray, models: list, folds: list, refresh: int = 250) -> np.ndarray:
+    """Test mean squared error of each model (columns) at each origin (rows). The train Gram matrix is
+    carried from one origin to the next: the rows that enter the train window are added and, for a
+    sliding window, the rows that leave it are subtracted. It is recomputed from the rows every
+    `refresh` origins (and whenever consecutive windows do not overlap) to stop rounding errors from
+    accumulating.
+    """
+
+    errors = np.empty((len(folds), len(models)))
+    gram, low, high = None, 0, 0
+
+    for i, (train, test) in enumerate(folds):
+        if (gram is None) or (i % refresh == 0) or (train.start >= high):
+            rows = design[train.start:train.stop]
+            gram = rows.T @ rows
+        else:
+            if train.stop > high:
+                rows = design[high:train.stop]
+                gram += rows.T @ rows
+            if train.start > low:
+                rows = design[low:train.start]
+                gram -= rows.T @ rows
+        low, high = train.start, train.stop
+
+        rows = design[test.start:test.stop]
+        test_gram = rows.T @ rows
+        errors[i] = [
+            gram_sse(test_gram, feats, target, solve_gram(gram, feats, target)) / len(test)
+            for feats, target in models
+            ]
+
+    return errors
+
+
+class Regression_Result:
+    """Result of one OLS experiment (see `RunRegressions.reg_results`). The model is fitted once, when
+    the object is created, and only the coefficients, their normalized covariance matrix (the
+    pseudo-inverse of the Gram matrix) and the validation errors are kept; the statsmodels results and
+    summary, the residuals and the predictions are computed on first access. Items are read as in a
+    dictionary: `result['mse']`, `result['residuals_train']`, etc.
+
+    With `spill_mb` (memory-bounded mode) the residual and prediction arrays larger than `spill_mb`
+    megabytes are written to `spill_dir` and read back as memory maps, and the statsmodels results
+    (which hold the design matrix) are not kept after use.
+    """
+
+    keys = ['spill_mb', 'spill_dir']
+    item_names = [
+        'feats', 'target', 'ols', 'summary', 'mse', 'rmse', 'residuals_train', 'residuals_validation',
+        'prediction_train', 'prediction_validation',
+        ]
+
+    def __init__(
+            self,
+            feats: list,
+            target: str,
+            train: pd.core.frame.DataFrame,
+            validation: pd.core.frame.DataFrame,
+            spill_mb: Union[float, None] = None,
+            spill_dir: Union[str, None] = None,
+            ):
+
+        from statsmodels.tools.tools import pinv_extended
+
+        self.feats = feats
+        self.target = target
+        self.train = train
+        self.validation = validation
+        self.spill_mb = spill_mb
+        self.spill_dir = spill_dir
+        self.cache: dict = {}
+
+        # Same estimator as `sm.OLS(...).fit()`. The data may be stored as float32/uint8 (see
+        # `compact_dtypes`); the model is always estimated in float64.
+        pinv, singular_values = pinv_extended(self.design('train'))
+        self.params = pinv @ self.endog('train')
+        self.normalized_cov_params = pinv @ pinv.T
+        self.rank = np.linalg.matrix_rank(np.diag(singular_values))
+        del pinv
+
+        # Error.
+        errors = self.endog('validation') - self.design('validation') @ self.params
+        self.mse = round(np.mean(errors**2), 2)
+        self.rmse = round(np.sqrt(self.mse), 2)
+
+    def design(self, name: str) -> np.ndarray:
+        """Constant and explanatory variables of the 'train' or 'validation' set, in float64."""
+
+        import statsmodels.api as sm
+
+        df = self.train if name == 'train' else self.validation
+
+        return sm.add_constant(df[self.feats], prepend=True).to_numpy(dtype=np.float64)
+
+    def endog(self, name: str) -> np.ndarray:
+        df = self.train if name == 'train' else self.validation
+
+        return df[self.target].to_numpy(dtype=np.float64)
+
+    def prediction(self, name: str) -> np.ndarray:
+        key = f'prediction_{name}'
+        if key not in self.cache:
+            self.cache[key] = self.spill(key, self.design(name) @ self.params)
+
+        return self.cache[key]
+
+    def residuals(self, name: str) -> pd.core.series.Series:
+        key = f'residuals_{name}'
+        if key not in self.cache:
+            df = self.train if name == 'train' else self.validation
+            values = self.spill(key, self.endog(name) - self.prediction(name))
+            self.cache[key] = pd.Series(values, index=df.index, name=f'resids_{name}', copy=False)
+
+        return self.cache[key]
+
+    def spill(self, name: str, values: np.ndarray) -> np.ndarray:
+        """`values`, or a read-only memory map of a copy on disk in memory-bounded mode."""
+
+        if (self.spill_mb is None) or (values.nbytes <= self.spill_mb * 2**20):
+            return values
+
+        import os
+        path = os.path.join(self.spill_dir, f'{id(self)}_{name}.npy')
+        np.save(path, values)
+
+        return np.load(path, mmap_mode='r')
+
+    def ols(self):
+        """statsmodels results of the fit (identical to the stored coefficients)."""
+
+        if 'ols' in self.cache:
+            return self.cache['ols']
+
+        import statsmodels.api as sm
+
+        ols = sm.OLS(self.endog('train'), self.design('train')).fit()
+        if self.spill_mb is None:
+            self.cache['ols'] = ols
+
+        return ols
+
+    def summary(self):
+        if 'summary' not in self.cache:
+            self.cache['summary'] = self.ols().summary2()
+
+        return self.cache['summary']
+
+    def __getitem__(self, key: str):
+        getters = {
+            'feats': lambda: self.feats,
+            'target': lambda: self.target,
+            'ols': self.ols,
+            'summary': self.summary,
+            'mse': lambda: self.mse,
+            'rmse': lambda: self.rmse,
+            'residuals_train': lambda: self.residuals('train'),
+            'residuals_validation': lambda: self.residuals('validation'),
+            'prediction_train': lambda: self.prediction('train'),
+            'prediction_validation': lambda: self.prediction('validation'),
+            }
+        if key not in getters:
+            raise KeyError(key)
+
+        return getters[key]()
+
+    def __iter__(self):
+        return iter(self.item_names)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.item_names
+
+
 class RunRegressions:
     def __init__(self):
         self.train: pd.core.frame.DataFrame = None 
@@ -26,6 +364,14 @@ class RunRegressions:
         self.y: list = []
         self.detail: list = []
         self.results_store: list = []
+        self.cv_store: list = []
+        self.bootstrap_store: list = []
+        self.walk_forward_store: list = []
+        self.influence_store: list = []
+        # Memory-bounded results (see `Regression_Result`).
+        self.spill_mb: Union[float, None] = None
+        self.spill_dir: Union[str, None] = None
+        self.spill_directory = None
 
 
     # Produce and store regression results for one experiment.
@@ -35,47 +381,17 @@ class RunRegressions:
         target: str,
         train: pd.core.frame.DataFrame,
         validation: pd.core.frame.DataFrame
-        ) -> dict:
-        
-        # Fit.
-        X_train = train[feats]
-        X_train_w_const = sm.add_constant(X_train, prepend=True)
-        y_train = train[target].values.reshape(-1, 1)
+        ) -> Regression_Result:
 
-        est = sm.OLS(y_train, X_train_w_const.values)
-        ols = est.fit()
-        
-        # Predict.
-        X_validation = validation[feats]
-        X_validation_w_const = sm.add_constant(X_validation, prepend=True)
-        y_validation = validation[target].values.reshape(-1, 1)
+        spill_dir = None
+        if self.spill_mb is not None:
+            if self.spill_directory is None:
+                import tempfile
+                # Removed with the `RunRegressions` object (or at exit).
+                self.spill_directory = tempfile.TemporaryDirectory(dir=self.spill_dir)
+            spill_dir = self.spill_directory.name
 
-        prediction_train = ols.predict(X_train_w_const.values)
-        prediction_validation = ols.predict(X_validation_w_const.values)
-        
-        # Error.
-        mse_ = round(mse(y_validation, prediction_validation), 2)
-        rmse_ = round(np.sqrt(mse_), 2)
-
-        # Residuals
-        resids_train = train[target] - prediction_train
-        resids_validation = validation[target] - prediction_validation
-
-        resids_train.name = 'resids_train'
-        resids_validation.name = 'resids_validation'
-
-        return {
-            'feats': feats,
-            'target': target,
-            'ols': est.fit(),
-            'summary': ols.summary2(),
-            'mse': mse_,
-            'rmse': rmse_,
-            'residuals_train': resids_train, 
-            'residuals_validation': resids_validation,
-            'prediction_train': prediction_train,
-            'prediction_validation': prediction_validation,
-            }
+        return Regression_Result(feats, target, train, validation, self.spill_mb, spill_dir)
 
     def produce_specific_result(self, store_index: int) -> None:
         result = self.reg_results(x_vars[store_index], target[store_index], self.train, self.validation)
@@ -92,6 +408,138 @@ class RunRegressions:
         return
 
 
+    def cross_validate(self, df: pd.core.frame.DataFrame, cv: 'Cross_Validation', n_jobs: Union[int, None] = None) -> None:
+        """Estimates every model (`X`, `y`) on each cross validation fold of `df` and stores the test
+        MSE of each fold in `cv_store`. The design matrix is built once; with `n_jobs` above 1 the folds
+        are evaluated by worker processes that share it.
+        """
+
+        columns, models = design_models(self.X, self.y)
+        values = df[columns].to_numpy(dtype=np.float64)
+        if np.isnan(values).any():
+            raise Exception('Cross validation requires variables without missing values.')
+
+        folds = [test for _, test in cv.split(df)]
+        _, errors = map_over_design(values, values.mean(axis=0), fold_errors, folds, n_jobs, {'models': models})
+
+        errors = np.array(errors).T
+        self.cv_store = [
+            {'feats': feats, 'target': target, 'mse': mse}
+            for feats, target, mse in zip(self.X, self.y, errors)
+            ]
+
+        return
+
+
+    def bootstrap(self, resampler: 'Bootstrap', confidence: Union[float, None] = None, n_jobs: Union[int, None] = None) -> None:
+        """Bootstrap distribution of the coefficients and of the validation RMSE of every model (`X`,
+        `y`), estimated on replicates of the train set; the percentile confidence intervals are stored
+        in `bootstrap_store`. Each replicate is a weighted least squares fit with the replicate counts
+        as weights, so no resampled copy of the train set is made; with `n_jobs` above 1 the batches
+        of replicates are computed by worker processes that share the design matrix.
+        """
+
+        if confidence is None:
+            confidence = 0.95
+        if (confidence <= 0) or (confidence >= 1):
+            raise Exception('`confidence` must be a value between 0 and 1.')
+
+        columns, models = design_models(self.X, self.y)
+        values = self.train[columns].to_numpy(dtype=np.float64)
+        validation_values = self.validation[columns].to_numpy(dtype=np.float64)
+        if np.isnan(values).any() or np.isnan(validation_values).any():
+            raise Exception('The bootstrap requires variables without missing values.')
+
+        means = values.mean(axis=0)
+        validation_design = build_design(validation_values, means)
+        context = {
+            'models': models,
+            'validation_gram': validation_design.T @ validation_design,
+            'validation_rows': validation_values.shape[0],
+            }
+
+        gram, batches = map_over_design(
+            values, means, bootstrap_batch, resampler.batches(values.shape[0]), n_jobs, context,
+            )
+
+        lower, upper = (1 - confidence) / 2, (1 + confidence) / 2
+        self.bootstrap_store = []
+        for i, (feats, target) in enumerate(models):
+            coefficients = np.concatenate([batch[i][0] for batch in batches])
+            rmse = np.sqrt(np.concatenate([batch[i][1] for batch in batches]))
+            estimate = solve_gram(gram, feats, target)
+            estimate_rmse = np.sqrt(gram_sse(context['validation_gram'], feats, target, estimate) / context['validation_rows'])
+
+            # The design is centred; the constant is brought back to the scale of the original variables.
+            feat_means = means[[feat - 1 for feat in feats[1:]]]
+            estimate[0] += means[target - 1] - estimate[1:] @ feat_means
+            coefficients[:, 0] += means[target - 1] - coefficients[:, 1:] @ feat_means
+
+            distribution = np.column_stack([coefficients, rmse])
+            table = pd.DataFrame(
+                {
+                    'estimate': np.append(estimate, estimate_rmse),
+                    'std_error': distribution.std(axis=0, ddof=1),
+                    f'{100 * lower:g}%': np.quantile(distribution, lower, axis=0),
+                    f'{100 * upper:g}%': np.quantile(distribution, upper, axis=0),
+                },
+                index=['const', *self.X[i], 'rmse_validation'],
+                )
+
+            self.bootstrap_store.append({
+                'feats': self.X[i],
+                'target': self.y[i],
+                'coefficients': coefficients,
+                'rmse': rmse,
+                'table': table,
+                })
+
+        return
+
+
+    def walk_forward(self, df: pd.core.frame.DataFrame, splitter: 'Walk_Forward') -> None:
+        """Estimates every model (`X`, `y`) at each origin of a walk-forward evaluation of `df` (in its
+        row order) and stores the test MSE of each origin in `walk_forward_store`. The OLS sufficient
+        statistics (the Gram matrix) are updated as the origin advances instead of refitting.
+        """
+
+        columns, models = design_models(self.X, self.y)
+        values = df[columns].to_numpy(dtype=np.float64)
+        if np.isnan(values).any():
+            raise Exception('The walk-forward evaluation requires variables without missing values (e.g. replace the missing values left by lags and rolling windows).')
+
+        folds = splitter.split(values.shape[0])
+        # Centred on the first train window only, so no statistic of later rows enters the design.
+        design = build_design(values, values[folds[0][0].start:folds[0][0].stop].mean(axis=0))
+        del values
+        errors = walk_forward_errors(design, models, folds).T
+
+        self.walk_forward_store = [
+            {'feats': feats, 'target': target, 'mse': mse}
+            for feats, target, mse in zip(self.X, self.y, errors)
+            ]
+
+        return
+
+
+    def influence(self, top_k: Union[int, None] = None, sort_by: Union[str, None] = None) -> None:
+        """Leverage, studentized residuals, Cook's distance and DFFITS of the train rows of every model
+        in `results_store` (see `st.influence_table`), stored in `influence_store`.
+        """
+
+        self.influence_store = []
+        for result in self.results_store:
+            self.influence_store.append({
+                'feats': result['feats'],
+                'target': result['target'],
+                'table': st.influence_table(
+                    result.design('train'), result['residuals_train'].to_numpy(), self.train.index, top_k, sort_by,
+                    ),
+                })
+
+        return
+
+
     def print_summary(self) -> None:
         print('## Summary:\n')
         for i, tuple_ in enumerate(zip(self.detail, self.y, self.X,)):
@@ -109,7 +557,24 @@ class RunRegressions:
         return result_printer(self.results_store[store_index: int])      
 
 
-    def print_all_results(self, residuals_analysis: bool, residuals_set: str) -> None:
+    def print_all_results(self, residuals_analysis: bool, residuals_set: str, residual_tests: Union[dict, None] = None) -> None:
+        """`residual_tests` holds the options of the heteroskedasticity and autocorrelation tests
+        (`white_max_terms`, `lags`), which are run on the train residuals; the tests are skipped when
+        it is None.
+        """
+
+        # The tests of all the models are run together, on one residual matrix.
+        if residuals_analysis:
+            normality_tests = st.normality_table(pd.DataFrame({
+                i: result_dict[f'residuals_{residuals_set}'].to_numpy()
+                for i, result_dict in enumerate(self.results_store)
+                }))
+        if residuals_analysis and (residual_tests is not None):
+            specification_tests = st.residual_tests_table(
+                self.results_store,
+                residual_tests.get('white_max_terms'),
+                residual_tests.get('lags'),
+                )
 
         for i, result_dict in enumerate(self.results_store):
 
@@ -138,7 +603,11 @@ class RunRegressions:
 
                 print(f'\n## Residuals Analysis ({residuals_set} set).\n')
 
-                print(normality_tests(result_dict[f'residuals_{residuals_set}']))
+                print(normality_tests.xs(i, level='model').round(4))
+
+                if residual_tests is not None:
+                    print('\nHeteroskedasticity and autocorrelation (train set):\n')
+                    print(specification_tests.xs(i, level='model').round(4))
 
                 # Residuals vs target.            
                 dv.resid_visual_analysis_1(
@@ -187,3 +656,48 @@ class RunRegressions:
             print(comparison, '\n')
 
         return 
+
+    def compare_cv_results(self, store: Union[list, None] = None) -> None:
+        """Mean and standard deviation of the test MSE/RMSE across the cross validation folds (or the
+        origins of `walk_forward_store`, when passed as `store`).
+        """
+
+        if store is None:
+            store = self.cv_store
+
+        for target in list(dict.fromkeys(self.y)):
+            results = [result for result in store if result['target'] == target]
+
+            comparison = pd.DataFrame(
+                {
+                    'mse_mean': [result['mse'].mean() for result in results],
+                    'mse_std': [result['mse'].std() for result in results],
+                    'rmse_mean': [np.sqrt(result['mse']).mean() for result in results],
+                    'rmse_std': [np.sqrt(result['mse']).std() for result in results],
+                },
+                index=[', '.join(result['feats']) for result in results],
+                ).round(2)
+
+            comparison = comparison.sort_values(by='mse_mean', ascending=True)
+
+            print(f'Target: {target}')
+            print(comparison, '\n')
+
+        return
+
+    def print_bootstrap_results(self) -> None:
+        for i, result in enumerate(self.bootstrap_store):
+            print(f"Regression Nr: {i+1} - Target: '{result['target']}'")
+            print(result['table'].round(4), '\n')
+
+        return
+
+    def print_influence_results(self) -> None:
+        for i, result in enumerate(self.influence_store):
+            # Usual cut-offs: Cook's distance above 4 / n and |DFFITS| above 2 * sqrt(p / n).
+            n, p = (self.train.shape[0], len(result['feats']) + 1)
+            print(f"Regression Nr: {i+1} - Target: '{result['target']}'")
+            print(f"Cut-offs: Cook's distance {round(4 / n, 4)}, |DFFITS| {round(2 * np.sqrt(p / n), 4)}\n")
+            print(result['table'].round(4), '\n')
+
+        return
@@ -2,14 +2,15 @@ from typing import Union
 
 from pandas.api.types import is_numeric_dtype
 
-from statsmodels.stats.outliers_influence import variance_inflation_factor
-from statsmodels.tools.tools import add_constant
-
 import pandas as pd
 import numpy as np
 
 
-def describe_data(data_sets: dict, subset: Union[bool, str]) -> pd.core.frame.DataFrame:
+def describe_data(
+        data_sets: dict,
+        subset: Union[bool, str],
+        profiles: Union['Profile_Store', None] = None,
+        ) -> pd.core.frame.DataFrame:
 
     if (subset is False):
         return ''
@@ -24,41 +25,55 @@ def describe_data(data_sets: dict, subset: Union[bool, str]) -> pd.core.frame.Da
             raise Exception("The main data set hasn't been split.")
         if (subset == 'main') or (subset is True):
             subset = 'main'
-            description = data_sets['train'].describe()
+            description = describe(data_sets, 'train', profiles)
 
     if (len(data_sets) > 1):
 
         if (subset is True) or (subset=='train'):
             subset = 'train'
-            description = data_sets[subset].describe()
+            description = describe(data_sets, subset, profiles)
 
         if subset == 'main':
-            description = data_sets['main'].describe()
+            description = describe(data_sets, 'main', profiles)
 
         if subset == 'validation':
-            description = data_sets['validation'].describe()
+            description = describe(data_sets, 'validation', profiles)
 
         if subset == 'test':
-            description = data_sets['test'].describe()
+            description = describe(data_sets, 'test', profiles)
 
     print(f'\nVariable Description After Data Processing ({subset} set):\n')
 
     return description
 
+
+def describe(data_sets: dict, name: str, profiles: Union['Profile_Store', None] = None) -> pd.core.frame.DataFrame:
+    """Support function that serves `describe()` from the stored summary accumulator when there is one."""
+
+    df = data_sets[name]
+
+    if (profiles is None) or (df.select_dtypes(include=[np.number]).shape[1] == 0):
+        return df.describe()
+
+    return profiles.get(name, df).describe()
+
     
-def correlation_table(df: pd.core.frame.DataFrame) -> None:
+def correlation_table(
+        df: pd.core.frame.DataFrame,
+        covariance: Union['Covariance_Accumulator', None] = None,
+        ) -> pd.core.frame.DataFrame:
 
-    corr = df.corr(method='pearson', numeric_only=True)
+    if covariance is None:
+        covariance = Covariance_Accumulator.from_frame(df)
 
-    corr_triangular = (
-        pd.DataFrame(
-            data=np.triu(corr.values),
-            columns=corr.columns,
-            index=corr.index)
-            .round(3)
-            .replace(0, '-', regex=True)
-            .replace(1.0, '-', regex=True)
-        )
+    corr = covariance.correlation()
+
+    # Only the final table is formatted: zeros (lower triangle) and ones (diagonal) are shown as '-'.
+    values = np.triu(corr.to_numpy()).round(3)
+    cells = values.astype(object)
+    cells[(values == 0) | (values == 1)] = '-'
+
+    corr_triangular = pd.DataFrame(data=cells, columns=corr.columns, index=corr.index).infer_objects()
 
     corr_triangular = (
         corr_triangular
@@ -74,34 +89,51 @@ def correlation_table(df: pd.core.frame.DataFrame) -> None:
 
 
 class VIF:
+    """Variance inflation factors of groups of explanatory variables. The VIF of a variable is the
+    diagonal element of the inverse of the correlation matrix of its group, which is the same as
+    1 / (1 - R^2) of the regression of the variable on the rest of the group and a constant. The
+    correlation matrix of all the variables is computed once and each group uses its submatrix.
+    """
+
     def __init__(self):
         self.df: pd.core.frame.DataFrame = None
+        self.covariance = None # optional `Covariance_Accumulator` of `df`
         self.X: list = []
         self.vif_container: list = []
 
-    def get_vif(self, df, feats):
-
-        df = df[feats]
+    def get_vif(self, df, feats, corr: Union[pd.core.frame.DataFrame, None] = None):
+        """VIFs of the numeric variables in `feats`, taken from `corr` when it is given."""
 
-        numerical = df[[col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]]
+        numerical = [col for col in df[feats].columns if pd.api.types.is_numeric_dtype(df[col])]
 
-        X = add_constant(numerical)
+        if corr is None:
+            corr = correlation_matrix(df, numerical)
 
         vif_series = (
             pd.Series(
-                [variance_inflation_factor(X.values, i) for i in range(X.shape[1])], 
-                index=X.columns,
+                vif_from_correlation(corr.loc[numerical, numerical].to_numpy()),
+                index=numerical,
                 name='VIF',
                 )
-                .drop('const')
                 .sort_values()
             )
-        
+
         return vif_series
 
     def store_vif(self):
+        columns = list(dict.fromkeys(
+            col for feats in self.X for col in feats if pd.api.types.is_numeric_dtype(self.df[col])
+            ))
+
+        # With missing values each group keeps its own complete rows (as in a regression per group).
+        corr = None
+        if (self.covariance is not None) and self.covariance.complete():
+            corr = self.covariance.correlation(columns)
+        elif not self.df[columns].isna().to_numpy().any():
+            corr = correlation_matrix(self.df, columns)
+
         for feats in self.X:
-            vif_series = self.get_vif(self.df, feats)
+            vif_series = self.get_vif(self.df, feats, corr)
             self.vif_container.append(vif_series)
 
         return
@@ -112,4 +144,175 @@ class VIF:
             print(vif_series)
             print('\n------------------------------------\n')
 
-        return
\ No newline at end of file
+        return
+
+
+def correlation_matrix(df: pd.core.frame.DataFrame, columns: list) -> pd.core.frame.DataFrame:
+    """Pearson correlation matrix of `columns` over the rows without missing values."""
+
+    values = df[columns].to_numpy(dtype=np.float64)
+    values = values[~np.isnan(values).any(axis=1)]
+    values = values - values.mean(axis=0)
+    cross = values.T @ values
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.sqrt(np.diag(cross))
+        corr = cross / np.outer(std, std)
+
+    return pd.DataFrame(corr, index=columns, columns=columns)
+
+
+def vif_from_correlation(corr: np.ndarray) -> np.ndarray:
+    """Diagonal of the inverse of a correlation matrix, via its Cholesky factor. When the matrix is
+    (nearly) singular each VIF is computed from the pseudo-inverse of the correlations between the
+    other variables; perfectly collinear variables get an infinite VIF and constant variables NaN.
+    """
+
+    vif = np.full(corr.shape[0], np.nan)
+    valid = ~np.isnan(np.diag(corr))
+    corr = corr[np.ix_(valid, valid)]
+    k = corr.shape[0]
+
+    if k == 1:
+        vif[valid] = 1.0
+        return vif
+
+    try:
+        inverse_factor = np.linalg.inv(np.linalg.cholesky(corr))
+        diagonal = (inverse_factor**2).sum(axis=0)
+        if np.isfinite(diagonal).all() and (diagonal.max() < 1e10):
+            vif[valid] = diagonal
+            return vif
+    except np.linalg.LinAlgError:
+        pass
+
+    diagonal = np.empty(k)
+    for i in range(k):
+        others = np.arange(k) != i
+        r = corr[others, i]
+        unexplained = 1 - r @ np.linalg.pinv(corr[np.ix_(others, others)], hermitian=True) @ r
+        diagonal[i] = 1 / unexplained if unexplained > 1e-10 else np.inf
+    vif[valid] = diagonal
+
+    return vif
+
+
+class Covariance_Accumulator:
+    """Pairwise covariances and Pearson correlations of the numeric columns of a data set, accumulated
+    chunk by chunk. For every pair of columns it keeps the number of rows where both are present and
+    the sums of each column, of its squares and of the cross products over those rows, so missing
+    values are handled pairwise as in `DataFrame.corr`. The sums are taken on values shifted by a
+    reference per column (the means of the first chunk) to limit cancellation. Accumulators of
+    different chunks (e.g. computed by worker processes) can be combined with `merge`.
+    """
+
+    def __init__(self, columns: list):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.shift = None
+        self.count = np.zeros((k, k))
+        # `sums[i, j]`: sum of column i over the rows where columns i and j are both present.
+        self.sums = np.zeros((k, k))
+        self.squares = np.zeros((k, k))
+        self.products = np.zeros((k, k))
+
+    def from_frame(df: pd.core.frame.DataFrame, chunk_rows: int = 200_000) -> 'Covariance_Accumulator':
+        """Accumulator of all the numeric columns of `df`."""
+
+        columns = [col for col in df.columns if is_numeric_dtype(df[col])]
+        accumulator = Covariance_Accumulator(columns)
+        for start in range(0, df.shape[0], chunk_rows):
+            accumulator.update(df[columns].iloc[start:start + chunk_rows])
+
+        return accumulator
+
+    def update(self, chunk: pd.core.frame.DataFrame) -> 'Covariance_Accumulator':
+        values = chunk[self.columns].to_numpy(dtype=np.float64)
+        present = ~np.isnan(values)
+
+        if self.shift is None:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                self.shift = np.nan_to_num(np.nansum(values, axis=0) / present.sum(axis=0))
+
+        values = values - self.shift
+        if present.all():
+            self.count += values.shape[0]
+            column_sums = values.sum(axis=0)
+            column_squares = (values**2).sum(axis=0)
+            self.sums += column_sums[:, None]
+            self.squares += column_squares[:, None]
+        else:
+            values[~present] = 0.0
+            indicator = present.astype(np.float64)
+            self.count += indicator.T @ indicator
+            self.sums += values.T @ indicator
+            self.squares += (values**2).T @ indicator
+        self.products += values.T @ values
+
+        return self
+
+    def shifted(self, shift: np.ndarray) -> tuple:
+        """Sums, squares and products re-expressed around another shift."""
+
+        d = (self.shift - shift)[:, None]
+        sums = self.sums + self.count * d
+        squares = self.squares + 2 * d * self.sums + self.count * d**2
+        products = self.products + d * self.sums.T + d.T * self.sums + self.count * d * d.T
+
+        return (sums, squares, products)
+
+    def merge(self, other: 'Covariance_Accumulator') -> 'Covariance_Accumulator':
+        if other.columns != self.columns:
+            raise Exception('Only accumulators of the same columns can be merged.')
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift
+
+        sums, squares, products = other.shifted(self.shift)
+        self.count += other.count
+        self.sums += sums
+        self.squares += squares
+        self.products += products
+
+        return self
+
+    def centred(self, columns: Union[list, None] = None) -> tuple:
+        """Pairwise counts, centred cross products and centred sums of squares of each column."""
+
+        index = slice(None) if columns is None else [self.columns.index(col) for col in columns]
+        count = self.count[index][:, index]
+        sums = self.sums[index][:, index]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cross = self.products[index][:, index] - sums * sums.T / count
+            squares = self.squares[index][:, index] - sums**2 / count
+
+        return (count, cross, np.maximum(squares, 0.0))
+
+    def covariance(self, columns: Union[list, None] = None, ddof: int = 1) -> pd.core.frame.DataFrame:
+        columns = self.columns if columns is None else list(columns)
+        count, cross, _ = self.centred(columns)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            covariance = np.where(count > ddof, cross / (count - ddof), np.nan)
+
+        return pd.DataFrame(covariance, index=columns, columns=columns)
+
+    def correlation(self, columns: Union[list, None] = None) -> pd.core.frame.DataFrame:
+        """Same as `DataFrame.corr(method='pearson', numeric_only=True)`, up to rounding."""
+
+        columns = self.columns if columns is None else list(columns)
+        count, cross, squares = self.centred(columns)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = cross / np.sqrt(squares * squares.T)
+        corr = np.where((count > 1) & (squares > 0) & (squares.T > 0), np.clip(corr, -1, 1), np.nan)
+        np.fill_diagonal(corr, np.where(np.isnan(np.diag(corr)), np.nan, 1.0))
+
+        return pd.DataFrame(corr, index=columns, columns=columns)
+
+    def complete(self) -> bool:
+        """Whether every pair of columns was observed on the same rows (no missing values)."""
+
+        return bool((self.count == self.count.max()).all())
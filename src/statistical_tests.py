@@ -1,38 +1,314 @@
 from typing import Union
 
 from scipy.stats import shapiro as shapiro_test
-from scipy.stats import normaltest as dagostino_test 
-from scipy.stats import kstest as kol_smir_test 
-from scipy.stats import jarque_bera as jarque_bera_test
+from scipy.stats import chi2, kstwo
+from scipy.special import ndtr
 
 from pandas.api.types import is_numeric_dtype
 
-from statsmodels.stats.outliers_influence import variance_inflation_factor
-from statsmodels.tools.tools import add_constant
-
 import pandas as pd
 import numpy as np
 
+
+normality_test_names = ['Shapiro-Wilk', "D'Agostino's", 'Kolmogorov-Smirnov', "Jarque-Bera"]
+
+
 def normality_tests(residuals: pd.core.series.Series) -> pd.core.frame.DataFrame:
-    
-    normality_tests = pd.DataFrame(
-        {
-            'Statistic': [
-                shapiro_test(residuals)[0],
-                dagostino_test(residuals)[0],
-                kol_smir_test(residuals, 'norm')[0],
-                jarque_bera_test(residuals)[0],
-            ],
-            'p-value': [
-                shapiro_test(residuals)[1],
-                dagostino_test(residuals)[1],
-                kol_smir_test(residuals, 'norm')[1],
-                jarque_bera_test(residuals)[1],
-            ],
-        },
-        index = ['Shapiro-Wilk', "D'Agostino's", 'Kolmogorov-Smirnov', "Jarque-Bera"],  
-    )
-    
-    normality_tests.index.name = 'test'
+    """Normality tests of one series of residuals (see `normality_table`)."""
+
+    normality_tests = normality_table(residuals.to_frame(name='residuals')).xs('residuals', level='model')
 
     return normality_tests.round(4)
+
+
+def normality_table(
+        residuals: pd.core.frame.DataFrame,
+        shapiro_max: int = 5000,
+        rand_state: int = 0,
+        ) -> pd.core.frame.DataFrame:
+    """Shapiro-Wilk, D'Agostino's K^2, Kolmogorov-Smirnov (against the standard normal) and Jarque-Bera
+    tests of each column of `residuals` (one column per model), in one table indexed by model and test.
+    The moments are computed once for all the columns and shared by D'Agostino's and Jarque-Bera tests;
+    the Kolmogorov-Smirnov statistics are computed on the sorted matrix. Missing values are dropped per
+    column (columns with the same missing rows are tested together).
+
+    The Shapiro-Wilk p-value is only accurate up to 5000 observations: above `shapiro_max` the test is
+    run on a random subsample of `shapiro_max` rows, the same for every model and reproducible with
+    `rand_state`. The column `n` gives the number of observations used by each test.
+    """
+
+    groups: dict = {}
+    missing = residuals.isna().to_numpy()
+    for j, col in enumerate(residuals.columns):
+        groups.setdefault(missing[:, j].tobytes(), []).append(j)
+
+    tables = []
+    for positions in groups.values():
+        values = residuals.iloc[:, positions].to_numpy(dtype=np.float64)
+        values = values[~np.isnan(values[:, 0])]
+        tables.append(normality_statistics(values, shapiro_max, rand_state).assign(
+            model=np.repeat(residuals.columns[positions], len(normality_test_names)),
+            ))
+
+    table = pd.concat(tables).set_index(['model', 'test'])
+
+    return table.reindex(pd.MultiIndex.from_product([residuals.columns, normality_test_names], names=['model', 'test']))
+
+
+def normality_statistics(values: np.ndarray, shapiro_max: int, rand_state: int) -> pd.core.frame.DataFrame:
+    """Support function of `normality_table` for a matrix without missing values (one column per model)."""
+
+    n, k = values.shape
+    statistic = np.full((k, 4), np.nan)
+    p_value = np.full((k, 4), np.nan)
+    used = np.zeros((k, 4), dtype=int)
+
+    if n >= 3:
+        rows = slice(None)
+        if n > shapiro_max:
+            rows = np.sort(np.random.default_rng(rand_state).choice(n, shapiro_max, replace=False))
+        sample = values[rows]
+        for j in range(k):
+            statistic[j, 0], p_value[j, 0] = shapiro_test(sample[:, j])
+        used[:, 0] = sample.shape[0]
+
+    # Biased central moments, shared by D'Agostino's and Jarque-Bera tests.
+    deviations = values - values.mean(axis=0)
+    squares = deviations**2
+    m2 = squares.mean(axis=0)
+    m3 = (squares * deviations).mean(axis=0)
+    m4 = (squares**2).mean(axis=0)
+    del deviations, squares
+    with np.errstate(invalid='ignore', divide='ignore'):
+        skewness = np.where(m2 > 0, m3 / m2**1.5, np.nan)
+        kurtosis = np.where(m2 > 0, m4 / m2**2, np.nan)
+
+    if n >= 8:
+        statistic[:, 1] = skew_z(skewness, n)**2 + kurtosis_z(kurtosis, n)**2
+        p_value[:, 1] = chi2.sf(statistic[:, 1], 2)
+        used[:, 1] = n
+
+    if n > 0:
+        # Two-sided one-sample test against N(0, 1), exact distribution of the statistic.
+        cdf = ndtr(np.sort(values, axis=0))
+        steps = np.arange(1, n + 1)[:, None] / n
+        statistic[:, 2] = np.maximum((steps - cdf).max(axis=0), (cdf - (steps - 1 / n)).max(axis=0))
+        p_value[:, 2] = np.clip(kstwo.sf(statistic[:, 2], n), 0, 1)
+        used[:, 2] = n
+        del cdf
+
+        statistic[:, 3] = n / 6 * (skewness**2 + (kurtosis - 3)**2 / 4)
+        p_value[:, 3] = chi2.sf(statistic[:, 3], 2)
+        used[:, 3] = n
+
+    return pd.DataFrame({
+        'test': np.tile(normality_test_names, k),
+        'Statistic': statistic.ravel(),
+        'p-value': p_value.ravel(),
+        'n': used.ravel(),
+        })
+
+
+def skew_z(skewness: np.ndarray, n: int) -> np.ndarray:
+    """Normal approximation of the sample skewness (D'Agostino, as in `scipy.stats.skewtest`)."""
+
+    y = skewness * np.sqrt(((n + 1) * (n + 3)) / (6.0 * (n - 2)))
+    beta2 = 3.0 * (n**2 + 27*n - 70) * (n + 1) * (n + 3) / ((n - 2.0) * (n + 5) * (n + 7) * (n + 9))
+    w2 = -1 + np.sqrt(2 * (beta2 - 1))
+    delta = 1 / np.sqrt(0.5 * np.log(w2))
+    alpha = np.sqrt(2.0 / (w2 - 1))
+    y = np.where(y == 0, 1, y)
+
+    return delta * np.log(y / alpha + np.sqrt((y / alpha)**2 + 1))
+
+
+def kurtosis_z(kurtosis: np.ndarray, n: int) -> np.ndarray:
+    """Normal approximation of the sample kurtosis (Anscombe and Glynn, as in `scipy.stats.kurtosistest`)."""
+
+    expected = 3.0 * (n - 1) / (n + 1)
+    variance = 24.0 * n * (n - 2) * (n - 3) / ((n + 1) * (n + 1.0) * (n + 3) * (n + 5))
+    x = (kurtosis - expected) / np.sqrt(variance)
+    sqrt_beta1 = 6.0 * (n*n - 5*n + 2) / ((n + 7) * (n + 9)) * np.sqrt((6.0 * (n + 3) * (n + 5)) / (n * (n - 2) * (n - 3)))
+    a = 6.0 + 8.0 / sqrt_beta1 * (2.0 / sqrt_beta1 + np.sqrt(1 + 4.0 / sqrt_beta1**2))
+    denominator = 1 + x * np.sqrt(2 / (a - 4.0))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        term = np.sign(denominator) * np.where(denominator == 0, np.nan, ((1 - 2.0 / a) / np.abs(denominator))**(1 / 3.0))
+
+    return (1 - 2 / (9.0 * a) - term) / np.sqrt(2 / (9.0 * a))
+
+
+class Residual_Tests:
+    keys = ['white_max_terms', 'lags']
+
+
+def residual_tests_table(
+        results_store: list,
+        white_max_terms: Union[int, None] = None,
+        lags: Union[int, None] = None,
+        ) -> pd.core.frame.DataFrame:
+    """Breusch-Pagan, White, Durbin-Watson and Ljung-Box tests of the train residuals of the results
+    of `RunRegressions.reg_results`, in one table indexed by model (position in `results_store`) and
+    test. The auxiliary regressions reuse the pseudo-inverse of the Gram matrix kept by each result
+    and the autocorrelation tests are computed for all the models together.
+    """
+
+    tables = []
+    for i, result in enumerate(results_store):
+        tables.append(heteroskedasticity_tests(
+            result['residuals_train'].to_numpy(), result.design('train'), result.normalized_cov_params, white_max_terms,
+            ).assign(model=i))
+
+    residuals = pd.DataFrame({i: result['residuals_train'].to_numpy() for i, result in enumerate(results_store)})
+    tables.append(autocorrelation_tests(residuals, lags))
+
+    return pd.concat(tables).sort_values(by='model', kind='stable').set_index(['model', 'test'])
+
+
+def heteroskedasticity_tests(
+        resid: np.ndarray,
+        exog: np.ndarray,
+        inverse_gram: np.ndarray,
+        white_max_terms: Union[int, None] = None,
+        ) -> pd.core.frame.DataFrame:
+    """Breusch-Pagan (Koenker's studentized version) and White tests of the residuals of a fit of
+    `exog` (which must include the constant), with `inverse_gram` the pseudo-inverse of its Gram
+    matrix. Both are n * R^2 of a regression of the squared residuals: on `exog` for Breusch-Pagan and
+    on `exog`, its squares and cross products for White. The second regression is obtained from the
+    first by regressing its residuals on the squares and cross products made orthogonal to `exog`, so
+    `exog` is never refitted. When there are more than `white_max_terms` cross products (45 by
+    default, i.e. 10 variables) only the squares are used ('White (no cross terms)').
+    """
+
+    if white_max_terms is None:
+        white_max_terms = 45
+
+    n, k = exog.shape
+    squares = resid**2
+    total = ((squares - squares.mean())**2).sum()
+
+    remainder = squares - exog @ (inverse_gram @ (exog.T @ squares))
+    bp = n * (1 - (remainder**2).sum() / total)
+
+    variables = exog[:, 1:]
+    first, second = np.triu_indices(k - 1)
+    name = 'White'
+    if (k - 1) * (k - 2) / 2 > white_max_terms:
+        first = second = np.arange(k - 1)
+        name = 'White (no cross terms)'
+    products = variables[:, first] * variables[:, second]
+
+    # Products already spanned by `exog` (e.g. squares of dummies) do not add degrees of freedom.
+    orthogonal = products - exog @ (inverse_gram @ (exog.T @ products))
+    scale = np.sqrt((products**2).sum(axis=0))
+    keep = np.sqrt((orthogonal**2).sum(axis=0)) > 1e-8 * np.where(scale > 0, scale, 1)
+    orthogonal = orthogonal[:, keep]
+    coefficients, _, rank, _ = np.linalg.lstsq(orthogonal, remainder, rcond=None)
+    white = n * (1 - ((remainder - orthogonal @ coefficients)**2).sum() / total)
+    white_df = k - 1 + rank
+
+    return pd.DataFrame({
+        'test': ['Breusch-Pagan', name],
+        'Statistic': [bp, white],
+        'p-value': [chi2.sf(bp, k - 1), chi2.sf(white, white_df)],
+        'df': [k - 1, white_df],
+        })
+
+
+def autocorrelation_tests(residuals: pd.core.frame.DataFrame, lags: Union[int, None] = None) -> pd.core.frame.DataFrame:
+    """Durbin-Watson statistic and Ljung-Box test (`lags` lags, min(10, n // 5) by default) of each
+    column of `residuals` (one column per model, in row order). The autocorrelations of all the
+    columns are computed together with one FFT.
+    """
+
+    values = residuals.to_numpy(dtype=np.float64)
+    n = values.shape[0]
+    if lags is None:
+        lags = int(min(10, n // 5))
+
+    durbin_watson = (np.diff(values, axis=0)**2).sum(axis=0) / (values**2).sum(axis=0)
+
+    centred = values - values.mean(axis=0)
+    size = 1 << int(2 * n - 1).bit_length()
+    spectrum = np.fft.rfft(centred, n=size, axis=0)
+    autocovariance = np.fft.irfft(spectrum.real**2 + spectrum.imag**2, n=size, axis=0)[:lags + 1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        autocorrelation = autocovariance[1:] / autocovariance[0]
+    ljung_box = n * (n + 2) * ((autocorrelation**2) / (n - np.arange(1, lags + 1))[:, None]).sum(axis=0)
+
+    k = values.shape[1]
+    return pd.DataFrame({
+        'model': np.repeat(residuals.columns, 2),
+        'test': ['Durbin-Watson', 'Ljung-Box'] * k,
+        'Statistic': np.column_stack([durbin_watson, ljung_box]).ravel(),
+        'p-value': np.column_stack([np.full(k, np.nan), chi2.sf(ljung_box, lags)]).ravel(),
+        'df': np.tile([np.nan, lags], k),
+        })
+
+
+class Influence:
+    keys = ['top_k', 'sort_by']
+
+
+def influence_measures(exog: np.ndarray, resid: np.ndarray) -> dict:
+    """Leverage, internally and externally studentized residuals, Cook's distance and DFFITS of each
+    observation of an OLS fit (as `OLSInfluence` in statsmodels). The leverages are the squared row
+    norms of the thin orthonormal factor of `exog` (QR, or SVD when `exog` is rank deficient), so the
+    n x n hat matrix is never formed: O(n * p^2) time and O(n * p) memory.
+    """
+
+    n = exog.shape[0]
+    q, r = np.linalg.qr(exog)
+    diagonal = np.abs(np.diag(r))
+    if diagonal.min() <= diagonal.max() * max(exog.shape) * np.finfo(np.float64).eps:
+        q, s, _ = np.linalg.svd(exog, full_matrices=False)
+        q = q[:, s > s[0] * max(exog.shape) * np.finfo(np.float64).eps]
+    p = q.shape[1]
+    leverage = (q**2).sum(axis=1)
+    del q
+
+    squares = resid**2
+    ssr = squares.sum()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        remainder = 1 - leverage
+        internal = resid / np.sqrt(ssr / (n - p) * remainder)
+        # Residual variance without each observation.
+        external = resid / np.sqrt((ssr - squares / remainder) / (n - p - 1) * remainder)
+
+        return {
+            'leverage': leverage,
+            'student_resid_internal': internal,
+            'student_resid': external,
+            'cooks_d': internal**2 * leverage / (p * remainder),
+            'dffits': external * np.sqrt(leverage / remainder),
+            }
+
+
+def influence_table(
+        exog: np.ndarray,
+        resid: np.ndarray,
+        index: Union[pd.Index, None] = None,
+        top_k: Union[int, None] = None,
+        sort_by: Union[str, None] = None,
+        ) -> pd.core.frame.DataFrame:
+    """`influence_measures` of each row (labelled by `index`); with `top_k` only the `top_k` rows with
+    the largest absolute value of `sort_by` (Cook's distance by default) are kept, sorted.
+    """
+
+    if sort_by is None:
+        sort_by = 'cooks_d'
+
+    measures = influence_measures(exog, resid)
+    if sort_by not in measures:
+        raise Exception(f"`sort_by` can only be one of the following: {', '.join(measures)}.")
+
+    rows = np.arange(exog.shape[0])
+    if top_k is not None:
+        magnitude = np.nan_to_num(np.abs(measures[sort_by]), nan=-np.inf)
+        if top_k < rows.shape[0]:
+            rows = np.argpartition(-magnitude, top_k)[:top_k]
+        rows = rows[np.argsort(-magnitude[rows], kind='stable')]
+
+    return pd.DataFrame(
+        {name: values[rows] for name, values in measures.items()},
+        index=rows if index is None else index[rows],
+        )
@@ -1,4 +1,9 @@
 from typing import Union
+from types import ModuleType
+
+import importlib
+import importlib.util
+import sys
 
 def unfold_dictionary(original: dict, keys: Union[list, tuple]) -> dict:
     '''It checks if the original dictionary has all the keys as in `keys`;
@@ -8,4 +13,22 @@ def unfold_dictionary(original: dict, keys: Union[list, tuple]) -> dict:
     only_nones = {key: None for key in keys if key not in original.keys()}
     full = {**original, **only_nones}
 
-    return full
\ No newline at end of file
+    return full
+
+
+def lazy_import(name: str) -> ModuleType:
+    '''Returns the module without executing it; the import (and the import of its dependencies,
+    e.g. matplotlib or statsmodels) only takes place when one of its attributes is first used.
+    '''
+
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    return module